@@ -0,0 +1,48 @@
+import time
+import difflib
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+from multi_agent.listing import get_listing_index
+from multi_agent.company_search import CompanySearchIndex
+
+
+QUERIES = ["삼성전자", "삼전", "하닉", "SK하이닉스", "현대차", "엘지엔솔", "카카오", "네이버", "셀트리온", "삼성젼자", "ㅅㅅㅈㅈ", "posco"]
+
+
+def difflib_search(name_to_code: dict, company_name: str, top_n: int = 10):
+    """기존 find_similar_companies 방식 (전체 종목명과 SequenceMatcher 비교 후 전체 정렬)"""
+    similarities = [
+        (name, difflib.SequenceMatcher(None, company_name, name).ratio())
+        for name in name_to_code
+    ]
+    similarities.sort(key=lambda x: x[1], reverse=True)
+    return [(name, name_to_code[name]) for name, _ in similarities[:top_n]]
+
+
+def benchmark(repeat: int = 20):
+    listing_index = get_listing_index()
+    name_to_code = listing_index.name_to_code
+
+    start = time.perf_counter()
+    search_index = CompanySearchIndex(listing_index)
+    print(f"인덱스 생성: {(time.perf_counter() - start) * 1000:.1f}ms ({len(listing_index)}개 종목)")
+
+    print(f"{'query':<12}{'difflib(ms)':>12}{'index(ms)':>12}  difflib top1 / index top1")
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            old = difflib_search(name_to_code, query)
+        old_ms = (time.perf_counter() - start) * 1000 / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            new = search_index.search(query)
+        new_ms = (time.perf_counter() - start) * 1000 / repeat
+
+        print(f"{query:<12}{old_ms:>12.3f}{new_ms:>12.3f}  {old[0][0] if old else '-'} / {new[0][0] if new else '-'}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,51 @@
+import time
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+from multi_agent.market_analysis_agent.tools.sentiment_model import LocalSentimentClassifier
+
+
+SAMPLE_TEXTS = [
+    "3분기 영업이익이 시장 컨센서스를 크게 상회하며 실적 개선세가 뚜렷하다.",
+    "메모리 가격 하락으로 하반기 수익성 악화가 불가피할 전망이다.",
+    "목표주가를 기존 대비 15% 상향하고 투자의견 매수를 유지한다.",
+    "주요 고객사의 재고 조정으로 수주 공백이 장기화될 우려가 있다.",
+    "신규 공장 가동으로 내년 매출은 전년 대비 20% 성장할 것으로 예상된다.",
+    "환율 변동성 확대로 원가 부담이 커지며 마진이 축소되었다.",
+    "배당 확대와 자사주 매입 발표로 주주환원 정책이 강화되었다.",
+    "경쟁 심화로 점유율이 하락하고 있어 보수적 접근이 필요하다.",
+]
+
+
+def benchmark(backends, batch_sizes, n_texts: int):
+    # 리포트 요약 길이와 비슷하도록 문장을 이어 붙인 텍스트 생성
+    texts = [
+        " ".join(SAMPLE_TEXTS[(i + j) % len(SAMPLE_TEXTS)] for j in range(1 + i % 4))
+        for i in range(n_texts)
+    ]
+
+    print(f"{'backend':<12}{'batch':>8}{'load(s)':>10}{'total(s)':>10}{'texts/s':>10}")
+    for backend in backends:
+        start = time.perf_counter()
+        classifier = LocalSentimentClassifier(backend=backend)
+        load_seconds = time.perf_counter() - start
+        classifier.score(texts[:8])  # 워밍업
+
+        for batch_size in batch_sizes:
+            classifier.batch_size = batch_size
+            start = time.perf_counter()
+            classifier.score(texts)
+            seconds = time.perf_counter() - start
+            print(f"{classifier.backend:<12}{batch_size:>8}{load_seconds:>10.2f}{seconds:>10.2f}{n_texts / seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 감성 분류기 CPU 처리량 측정")
+    parser.add_argument("--backends", nargs="+", default=["torch", "quantized", "onnx"])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--texts", type=int, default=512)
+    args = parser.parse_args()
+
+    benchmark(args.backends, args.batch_sizes, args.texts)
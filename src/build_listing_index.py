@@ -0,0 +1,12 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+from multi_agent.listing import ListingIndex
+
+
+if __name__ == "__main__":
+    # 상장/폐지, 종목명 변경 반영을 위해 매일 장 시작 전 실행 (예: cron "0 7 * * 1-5")
+    listing_index = ListingIndex.refresh(os.environ["OPEN_DART_API_KEY"])
+    print(f"종목 인덱스 생성 완료: version={listing_index.version}, {len(listing_index)}개 종목")
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+from multi_agent.graph_db import get_neo4j_driver, close_neo4j_driver
+from multi_agent.mongo import get_mongo_collection, close_mongo_client
+from multi_agent.market_analysis_agent.tools.report_index import ReportVectorIndex, to_passages
+
+
+NEWS_QUERY = """
+MATCH (n:News)-[:MENTIONS_STOCKS]->(c:Company)
+WHERE n.date >= $start_date
+RETURN elementId(n) as news_id, c.stock_code as stock_code, c.stock_name as company,
+       toString(n.date) as date, n.title as title, n.body as body
+"""
+
+
+async def collect_report_passages(start_date: datetime):
+    """기간 내 전 종목 리포트 요약을 구절 목록으로 변환"""
+    cursor = get_mongo_collection("report").find(
+        {"date": {"$gte": start_date.strftime("%Y/%m/%d")}},
+        {"_id": True, "code": True, "company": True, "date": True, "provider": True, "opinion": True, "goal_price": True, "summary": True},
+    )
+    passages = []
+    async for doc in cursor:
+        document = {
+            "stock_code": doc.get("code"),
+            "company": doc.get("company"),
+            "date": doc.get("date"),
+            "title": f"투자의견 {doc.get('opinion') or '-'} / 목표가 {doc.get('goal_price') or '-'}",
+            "provider": doc.get("provider"),
+        }
+        passages += to_passages("report", str(doc["_id"]), document, doc.get("summary") or "")
+    return passages
+
+
+async def collect_news_passages(start_date: datetime):
+    """지식 그래프의 종목 언급 뉴스 본문을 종목별 구절 목록으로 변환"""
+    async with get_neo4j_driver().session() as session:
+        result = await session.run(NEWS_QUERY, start_date=start_date.strftime("%Y-%m-%d"))
+        news = await result.data()
+
+    passages = []
+    for item in news:
+        # 여러 종목을 언급한 뉴스는 종목마다 행을 만들되, 같은 내용의 임베딩은 한 번만 계산됨
+        passages += to_passages("news", f"{item['news_id']}:{item['stock_code']}", item, item["body"] or item["title"] or "")
+    return passages
+
+
+async def build_report_index(days: int, sources):
+    """기간 내 리포트/뉴스 중 새로 들어오거나 바뀐 구절만 임베딩하여 벡터 인덱스에 추가"""
+    start_date = datetime.now() - timedelta(days=days)
+    passages = []
+    try:
+        if "report" in sources:
+            passages += await collect_report_passages(start_date)
+        if "news" in sources:
+            passages += await collect_news_passages(start_date)
+    finally:
+        await close_neo4j_driver()
+        await close_mongo_client()
+
+    index = ReportVectorIndex()
+    added = index.upsert(passages)
+    index.create_indexes()
+    print(f"리포트/뉴스 벡터 인덱스 갱신 완료: 구절 {len(passages)}개 중 {added}개 추가")
+
+
+if __name__ == "__main__":
+    # 매일 장 마감 후 최근 며칠분만 실행 (예: cron "30 18 * * 1-5"), 최초 1회는 --days 365로 전체 적재
+    parser = argparse.ArgumentParser(description="리포트/뉴스 구절 벡터 인덱스 갱신")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--sources", nargs="+", choices=["report", "news"], default=["report", "news"])
+    args = parser.parse_args()
+
+    asyncio.run(build_report_index(args.days, args.sources))
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+from multi_agent.graph_db import get_neo4j_driver, close_neo4j_driver
+from multi_agent.mongo import close_mongo_client
+from multi_agent.market_analysis_agent.tools.sentiment import ReportSentimentAnalysisTool
+from multi_agent.market_analysis_agent.tools.sentiment_series import SentimentSeriesStore
+
+
+NEWS_QUERY = """
+MATCH (n:News)-[:MENTIONS_STOCKS]->(c:Company)
+WHERE n.date >= $start_date
+RETURN c.stock_code as stock_code, toString(n.date) as date, n.title as title, left(n.body, 1000) as body
+"""
+
+
+async def collect_report_scores(tool: ReportSentimentAnalysisTool, start_date: datetime, chunk_size: int = 1000):
+    """기간 내 전 종목 리포트 중 아직 채점되지 않은 리포트를 채점하여 저장한 뒤 점수 목록 반환"""
+    start = start_date.strftime("%Y/%m/%d")
+    reports = [
+        doc async for doc in tool.mongo_collection.find(
+            {"date": {"$gte": start}},
+            {"_id": True, "code": True, "date": True, "summary": True},
+        )
+    ]
+    for i in range(0, len(reports), chunk_size):
+        await tool.get_report_scores(reports[i:i + chunk_size])
+
+    scorer = await tool.get_scorer_name()
+    scores = [
+        doc async for doc in tool.score_collection.find(
+            {"date": {"$gte": start}, "scorer": scorer},
+            {"_id": False, "code": True, "date": True, "positive": True, "negative": True},
+        )
+    ]
+    frame = pd.DataFrame(scores, columns=["code", "date", "positive", "negative"]).rename(columns={"code": "stock_code"})
+    return frame.assign(source="report")
+
+
+async def collect_news_scores(tool: ReportSentimentAnalysisTool, start_date: datetime):
+    """지식 그래프의 종목 언급 뉴스를 채점한 점수 목록 반환"""
+    async with get_neo4j_driver().session() as session:
+        result = await session.run(NEWS_QUERY, start_date=start_date.strftime("%Y-%m-%d"))
+        news = await result.data()
+
+    texts = [{"date": item["date"], "summary": f"{item['title'] or ''}\n{item['body'] or ''}"} for item in news]
+    scores = await tool.score_texts(texts)
+    frame = pd.DataFrame(
+        [
+            {"stock_code": item["stock_code"], "date": item["date"], **score}
+            for item, score in zip(news, scores)
+            if score is not None
+        ],
+        columns=["stock_code", "date", "positive", "negative"],
+    )
+    return frame.assign(source="news")
+
+
+async def build_sentiment_series(days: int, sources):
+    """리포트/뉴스 감성 점수를 종목별 일간 시계열로 집계하여 저장"""
+    tool = ReportSentimentAnalysisTool()
+    start_date = datetime.now() - timedelta(days=days)
+    frames = []
+    try:
+        if "report" in sources:
+            frames.append(await collect_report_scores(tool, start_date))
+        if "news" in sources:
+            frames.append(await collect_news_scores(tool, start_date))
+    finally:
+        await close_neo4j_driver()
+        await close_mongo_client()
+
+    table = SentimentSeriesStore().build(pd.concat(frames, ignore_index=True))
+    print(f"감성 시계열 생성 완료: {table.index.get_level_values('stock_code').nunique()}개 종목, {len(table)}행")
+
+
+if __name__ == "__main__":
+    # 매일 장 마감 후 실행 (예: cron "0 18 * * 1-5")
+    parser = argparse.ArgumentParser(description="종목별 일간 감성 시계열 생성")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sources", nargs="+", choices=["report", "news"], default=["report", "news"])
+    args = parser.parse_args()
+
+    asyncio.run(build_sentiment_series(args.days, args.sources))
@@ -0,0 +1,21 @@
+import asyncio
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+from multi_agent.graph_db import get_neo4j_driver, close_neo4j_driver
+from multi_agent.subgraph_store import materialize_subgraphs
+
+
+async def build_subgraph_snapshots():
+    """모든 Company 노드의 경쟁사/업종 서브그래프를 로컬 스냅샷 저장소로 생성"""
+    try:
+        graph_version, count = await materialize_subgraphs(get_neo4j_driver())
+    finally:
+        await close_neo4j_driver()
+    print(f"서브그래프 스냅샷 생성 완료: graph_version={graph_version}, {count}개 종목")
+
+
+if __name__ == "__main__":
+    # 지식 그래프 적재 파이프라인이 끝난 직후 실행
+    asyncio.run(build_subgraph_snapshots())
@@ -0,0 +1,42 @@
+import argparse
+import asyncio
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+from multi_agent.fundamental_analysis_agent.tools.dart import AnalysisFinancialStatementTool
+from multi_agent.fundamental_analysis_agent.tools.warehouse import FinancialStatementWarehouse
+from multi_agent.listing import get_listing_index
+
+
+async def ingest_financial_statements(years, concurrency: int = 8):
+    """KRX 전 종목의 사업보고서 재무제표를 조회하여 로컬 재무제표 저장소를 다시 생성"""
+    stock_codes = get_listing_index().arrays['stock_code'].tolist()
+    # 조회 결과는 디스크 캐시에 저장되므로 재실행 시 새로 공시된 재무제표만 DART에서 받음
+    dart_tool = AnalysisFinancialStatementTool()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(stock_code, year):
+        async with semaphore:
+            return stock_code, year, await dart_tool.get_financial_statement(stock_code, year)
+
+    tasks = [fetch(stock_code, year) for stock_code in stock_codes for year in years]
+    statements = []
+    for i, task in enumerate(asyncio.as_completed(tasks), start=1):
+        statements.append(await task)
+        if i % 500 == 0:
+            print(f"{i}/{len(tasks)} 조회 완료")
+
+    table = FinancialStatementWarehouse().build(statements)
+    print(f"재무제표 저장소 생성 완료: {table.index.get_level_values('stock_code').nunique()}개 종목, {len(table)}행")
+
+
+if __name__ == "__main__":
+    current_year = datetime.now().year
+    parser = argparse.ArgumentParser(description="DART 재무제표 일괄 적재")
+    parser.add_argument("--years", type=int, nargs="+", default=[current_year - 1, current_year - 2, current_year - 3])
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    asyncio.run(ingest_financial_statements(args.years, args.concurrency))
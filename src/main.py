@@ -1,7 +1,9 @@
+import asyncio
 import logging
 import sys
 import os
 import dotenv
+from contextlib import asynccontextmanager
 
 # 환경 변수 로딩을 최우선으로 처리
 dotenv.load_dotenv(override=True)
@@ -11,6 +13,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers.stock import router as stock_router
 from routers.base import router as base_router
+from multi_agent.listing import get_listing_index
+from multi_agent.graph_db import close_neo4j_driver, ensure_graph_indexes
+from multi_agent.mongo import close_mongo_client
+from multi_agent.market_analysis_agent.tools.report import ensure_report_indexes
 
 
 DEBUG = False
@@ -25,8 +31,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 로컬 종목 인덱스 로딩 (없으면 최초 1회 생성). 첫 요청이 인덱스 생성을 기다리지 않도록 시작 시 수행
+    try:
+        await asyncio.to_thread(get_listing_index)
+    except Exception as e:
+        logger.warning(f"Listing index preload skipped: {e}")
+    try:
+        await ensure_graph_indexes()
+    except Exception as e:
+        logger.warning(f"Neo4j index setup skipped: {e}")
+    try:
+        await ensure_report_indexes()
+    except Exception as e:
+        logger.warning(f"MongoDB index setup skipped: {e}")
+    yield
+    # 공용 클라이언트 정리
+    await close_neo4j_driver()
+    await close_mongo_client()
+
+
 # FastAPI 애플리케이션 생성
-app = FastAPI(debug=DEBUG)
+app = FastAPI(debug=DEBUG, lifespan=lifespan)
 
 # CORS 미들웨어 설정
 app.add_middleware(
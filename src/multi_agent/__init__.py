@@ -1,20 +1,33 @@
 import os
-from .market_analysis_agent import agent as market_analysis_agent
-from .fundamental_analysis_agent import agent as fundamental_analysis_agent
-from .technical_analysis_agent import agent as technical_analysis_agent
-from .investment_strategy_agent import agent as investment_strategy_agent
-from .portfolio_analysis_agent import agent as portfolio_analysis_agent
-from .supervisor_agent import SupervisorAgent
 
-multi_agent = SupervisorAgent(
-    model="gpt-4o-mini",
-    agents=[
-        market_analysis_agent,
-        fundamental_analysis_agent,
-        technical_analysis_agent,
-        investment_strategy_agent,
-        portfolio_analysis_agent,
-    ],
-    checkpointer=None,
-    async_database_url=os.environ["ASYNC_DATABASE_URL"]
-)
\ No newline at end of file
+
+def build_multi_agent():
+    from .market_analysis_agent import agent as market_analysis_agent
+    from .fundamental_analysis_agent import agent as fundamental_analysis_agent
+    from .technical_analysis_agent import agent as technical_analysis_agent
+    from .investment_strategy_agent import agent as investment_strategy_agent
+    from .portfolio_analysis_agent import agent as portfolio_analysis_agent
+    from .supervisor_agent import SupervisorAgent
+
+    return SupervisorAgent(
+        model="gpt-4o-mini",
+        agents=[
+            market_analysis_agent,
+            fundamental_analysis_agent,
+            technical_analysis_agent,
+            investment_strategy_agent,
+            portfolio_analysis_agent,
+        ],
+        checkpointer=None,
+        async_database_url=os.environ["ASYNC_DATABASE_URL"]
+    )
+
+
+def __getattr__(name):
+    # 배치 스크립트가 multi_agent.* 하위 모듈만 import할 때는 에이전트 그래프를 만들지 않도록 최초 접근 시 생성
+    # 종목 인덱스는 서버 lifespan에서 미리 로딩하고, 그 외에는 첫 조회 시 로딩됨
+    global multi_agent
+    if name == "multi_agent":
+        multi_agent = build_multi_agent()
+        return multi_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,185 @@
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .listing import ListingIndex, get_listing_index
+
+
+# 자주 쓰이는 종목 약칭/영문명 → 상장 종목명
+COMPANY_ALIASES = {
+    "삼전": "삼성전자",
+    "samsung electronics": "삼성전자",
+    "하닉": "SK하이닉스",
+    "하이닉스": "SK하이닉스",
+    "sk hynix": "SK하이닉스",
+    "현차": "현대차",
+    "현대자동차": "현대차",
+    "hyundai motor": "현대차",
+    "기아차": "기아",
+    "kia": "기아",
+    "현모": "현대모비스",
+    "hyundai mobis": "현대모비스",
+    "엘전": "LG전자",
+    "엘지전자": "LG전자",
+    "lg electronics": "LG전자",
+    "엘화": "LG화학",
+    "엘지화학": "LG화학",
+    "lg chem": "LG화학",
+    "엘엔솔": "LG에너지솔루션",
+    "엘지엔솔": "LG에너지솔루션",
+    "lg energy solution": "LG에너지솔루션",
+    "삼바": "삼성바이오로직스",
+    "삼성바이오": "삼성바이오로직스",
+    "samsung biologics": "삼성바이오로직스",
+    "삼디": "삼성SDI",
+    "samsung sdi": "삼성SDI",
+    "삼물": "삼성물산",
+    "삼생": "삼성생명",
+    "삼화": "삼성화재",
+    "셀트": "셀트리온",
+    "celltrion": "셀트리온",
+    "네이버": "NAVER",
+    "카뱅": "카카오뱅크",
+    "kakao": "카카오",
+    "포스코": "POSCO홀딩스",
+    "posco": "POSCO홀딩스",
+    "한전": "한국전력",
+    "kepco": "한국전력",
+}
+
+_HANGUL_BASE = 0xAC00
+_HANGUL_END = 0xD7A3
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_NON_WORD = re.compile(r"[^0-9a-z가-힣ㄱ-ㅎㅏ-ㅣ]")
+
+
+def normalize(text: str) -> str:
+    """소문자 변환 후 공백/특수문자 제거"""
+    return _NON_WORD.sub("", text.lower())
+
+
+def decompose_jamo(text: str) -> str:
+    """한글 음절을 초성/중성/종성 자모로 분해 (오타·부분 입력에 강한 비교를 위해)"""
+    jamo = []
+    for char in text:
+        code = ord(char)
+        if _HANGUL_BASE <= code <= _HANGUL_END:
+            offset = code - _HANGUL_BASE
+            jamo.append(chr(0x1100 + offset // 588))
+            jamo.append(chr(0x1161 + (offset % 588) // 28))
+            if offset % 28:
+                jamo.append(chr(0x11A7 + offset % 28))
+        else:
+            jamo.append(char)
+    return "".join(jamo)
+
+
+def extract_initials(text: str) -> str:
+    """한글 음절의 초성만 추출 (예: 삼성전자 → ㅅㅅㅈㅈ)"""
+    return "".join(
+        _CHOSEONG[(ord(char) - _HANGUL_BASE) // 588] if _HANGUL_BASE <= ord(char) <= _HANGUL_END else char
+        for char in text
+    )
+
+
+def ngrams(text: str, n: int = 2) -> set:
+    padded = f"^{text}$"
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+class _NgramIndex:
+    """문서별 n-gram 집합에 대한 역색인. 질의와의 Dice 계수를 numpy로 한 번에 계산"""
+
+    def __init__(self, texts: List[str]):
+        postings: Dict[str, List[int]] = {}
+        sizes = np.zeros(len(texts), dtype=np.float64)
+        for doc_id, text in enumerate(texts):
+            grams = ngrams(text)
+            sizes[doc_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(doc_id)
+
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self.sizes = sizes
+
+    def scores(self, text: str) -> np.ndarray:
+        grams = ngrams(text)
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits:
+            return np.zeros(len(self.sizes))
+        overlap = np.bincount(np.concatenate(hits), minlength=len(self.sizes))
+        return 2 * overlap / (len(grams) + self.sizes)
+
+
+class CompanySearchIndex:
+    """종목명/약칭에 대한 자모 n-gram 퍼지 검색 인덱스"""
+
+    def __init__(self, listing_index: ListingIndex, aliases: Optional[Dict[str, str]] = None):
+        self.version = listing_index.version
+        names = listing_index.arrays["stock_name"].tolist()
+        codes = listing_index.arrays["stock_code"].tolist()
+        name_to_code = dict(zip(names, codes))
+
+        # 검색 대상: 상장 종목명 + (상장 종목을 가리키는) 약칭
+        documents: List[Tuple[str, str]] = list(zip(names, codes))
+        for alias, target in (aliases if aliases is not None else COMPANY_ALIASES).items():
+            if target in name_to_code:
+                documents.append((alias, name_to_code[target]))
+
+        self.code_to_name = dict(zip(codes, names))
+        self.doc_codes = np.array([code for _, code in documents])
+        self.exact = {}
+        for text, code in documents:
+            self.exact.setdefault(normalize(text), code)
+
+        normalized = [normalize(text) for text, _ in documents]
+        self.jamo_index = _NgramIndex([decompose_jamo(text) for text in normalized])
+        self.initials_index = _NgramIndex([extract_initials(text) for text in normalized])
+
+    def search(self, query: str, top_n: int = 10) -> List[Tuple[str, str, float]]:
+        """유사도 상위 종목을 (종목명, 종목코드, 점수) 목록으로 반환"""
+        normalized = normalize(query)
+        if not normalized:
+            return []
+
+        # 초성만 입력한 경우 (예: ㅅㅅㅈㅈ) 초성 인덱스 사용
+        if all(char in _CHOSEONG for char in normalized):
+            scores = self.initials_index.scores(normalized)
+        else:
+            scores = self.jamo_index.scores(decompose_jamo(normalized))
+
+        exact_code = self.exact.get(normalized)
+        if exact_code is not None:
+            scores = np.where(self.doc_codes == exact_code, np.maximum(scores, 1.0) + 1.0, scores)
+
+        # 약칭과 종목명이 같은 종목을 가리킬 수 있으므로 여유 있게 뽑은 뒤 종목코드 기준으로 중복 제거
+        k = min(len(scores), top_n * 2 + 1)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        results = []
+        seen = set()
+        for doc_id in candidates:
+            code = str(self.doc_codes[doc_id])
+            if code in seen:
+                continue
+            seen.add(code)
+            results.append((self.code_to_name[code], code, float(min(scores[doc_id], 1.0))))
+            if len(results) == top_n:
+                break
+        return results
+
+
+_search_index: Optional[CompanySearchIndex] = None
+_search_lock = threading.Lock()
+
+
+def get_company_search_index() -> CompanySearchIndex:
+    """종목 인덱스 버전이 바뀌면 다시 생성되는 공용 검색 인덱스"""
+    global _search_index
+    listing_index = get_listing_index()
+    if _search_index is None or _search_index.version != listing_index.version:
+        with _search_lock:
+            if _search_index is None or _search_index.version != listing_index.version:
+                _search_index = CompanySearchIndex(listing_index)
+    return _search_index
@@ -0,0 +1,200 @@
+import re
+import logging
+import threading
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+from .listing import ListingIndex, get_listing_index
+from .company_search import COMPANY_ALIASES
+
+logger = logging.getLogger(__name__)
+
+_STOCK_CODE_PATTERN = re.compile(r"(?<!\d)(\d{6})(?!\d)")
+_ASCII_WORD = re.compile(r"[0-9a-z]")
+_HANGUL = re.compile(r"[가-힣]")
+# 한글 종목명 뒤에 붙어도 같은 토큰으로 인정하는 조사
+PARTICLES = {
+    "은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "도", "로", "으로", "에서", "에게",
+    "보다", "랑", "이랑", "하고", "만", "까지", "부터", "대비", "이나", "나", "이며", "이고",
+}
+# 종목명이지만 일상어로 더 자주 쓰이는 단어 (두 글자 이하 한글 종목명은 길이 기준으로 따로 걸러짐)
+COMMON_WORD_NAMES = {"유니온", "에이스", "오로라", "모나리자", "코리아", "에코마케팅"}
+AMBIGUOUS_NAME_MAX_LENGTH = 2
+
+
+class AhoCorasick:
+    """여러 패턴을 텍스트 한 번 순회로 모두 찾는 Aho-Corasick 오토마톤"""
+
+    def __init__(self, patterns: Dict[str, object]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[str, object]]] = [[]]
+
+        for pattern, value in patterns.items():
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append((pattern, value))
+
+        # BFS로 실패 링크 구성
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, object]]:
+        """(시작 위치, 끝 위치, 값) 목록 반환"""
+        matches = []
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for pattern, value in self.output[state]:
+                matches.append((i - len(pattern) + 1, i + 1, value))
+        return matches
+
+
+class StockEntityResolver:
+    """종목명/약칭 사전 매칭과 6자리 종목코드 인식으로 질문 속 종목을 LLM 없이 찾는 클래스"""
+
+    def __init__(self, listing_index: ListingIndex, aliases: Optional[Dict[str, str]] = None):
+        self.version = listing_index.version
+        self.listing_index = listing_index
+        name_to_code = listing_index.name_to_code
+
+        # 값: (종목코드, 모호 여부). 짧은 한글 종목명과 일상어 종목명은 사전만으로 확정하지 않음
+        patterns = {name.lower(): (code, self.is_ambiguous_name(name)) for name, code in name_to_code.items()}
+        for alias, target in (aliases if aliases is not None else COMPANY_ALIASES).items():
+            if target in name_to_code:
+                # 약칭은 의도적으로 등록한 것이므로 길이 기준은 적용하지 않음
+                patterns.setdefault(alias.lower(), (name_to_code[target], alias in COMMON_WORD_NAMES))
+        self.automaton = AhoCorasick(patterns)
+
+    @staticmethod
+    def is_ambiguous_name(name: str) -> bool:
+        if name in COMMON_WORD_NAMES:
+            return True
+        return bool(_HANGUL.search(name)) and len(name) <= AMBIGUOUS_NAME_MAX_LENGTH
+
+    @staticmethod
+    def _on_boundary(text: str, start: int, end: int) -> bool:
+        """매칭이 토큰 경계에 있는지 확인 (한글 종목명 뒤에는 조사만 허용)"""
+        if start > 0:
+            before = text[start - 1]
+            if _ASCII_WORD.match(text[start]) and _ASCII_WORD.match(before):
+                return False
+            if _HANGUL.match(text[start]) and (_HANGUL.match(before) or _ASCII_WORD.match(before)):
+                return False
+        if end < len(text):
+            after = text[end]
+            if _ASCII_WORD.match(text[end - 1]) and _ASCII_WORD.match(after):
+                return False
+            if _HANGUL.match(text[end - 1]) and _ASCII_WORD.match(after):
+                return False
+            if _HANGUL.match(text[end - 1]) and _HANGUL.match(after):
+                suffix_end = end
+                while suffix_end < len(text) and _HANGUL.match(text[suffix_end]):
+                    suffix_end += 1
+                if text[end:suffix_end] not in PARTICLES:
+                    return False
+        return True
+
+    def _matches(self, query: str) -> List[Tuple[int, int, str, bool]]:
+        """토큰 경계에 있는 (시작 위치, 끝 위치, 종목코드, 모호 여부) 목록 (더 긴 매칭에 포함된 짧은 매칭 제외)"""
+        text = query.lower()
+        matches = [
+            (start, end, code, ambiguous)
+            for start, end, (code, ambiguous) in self.automaton.find_all(text)
+            if self._on_boundary(text, start, end)
+        ]
+
+        # 더 긴 매칭에 포함된 짧은 매칭 제거 (예: 'SK하이닉스' 안의 '하이닉스')
+        longest = [
+            (start, end, code, ambiguous) for start, end, code, ambiguous in matches
+            if not any(s <= start and end <= e and (e - s) > (end - start) for s, e, _, _ in matches)
+        ]
+        for match in _STOCK_CODE_PATTERN.finditer(text):
+            if match.group(1) in self.listing_index.code_to_row:
+                longest.append((match.start(), match.end(), match.group(1), False))
+        return sorted(longest)
+
+    def spans(self, query: str) -> List[Tuple[int, int, str]]:
+        """질문에 등장한 종목 중 사전만으로 확정할 수 있는 (시작 위치, 끝 위치, 종목코드) 목록을 등장 순서대로 반환"""
+        return [(start, end, code) for start, end, code, ambiguous in self._matches(query) if not ambiguous]
+
+    def resolve(self, query: str) -> Tuple[List[Dict[str, str]], bool]:
+        """질문에 등장한 종목(등장 순서, 중복 없음)과 LLM 확인이 필요한지 여부를 반환
+
+        모호한 종목명이 있거나 서로 겹치는 매칭이 있으면 사전 결과만으로 확정하지 않도록 True를 반환합니다.
+        """
+        matches = self._matches(query)
+        ambiguous = any(match[3] for match in matches) or any(
+            start < previous_end for (_, previous_end, _, _), (start, _, _, _) in zip(matches, matches[1:])
+        )
+
+        results = []
+        seen = set()
+        for _, _, code, weak in matches:
+            if weak or code in seen:
+                continue
+            seen.add(code)
+            results.append(self.listing_index.find_by_code(code))
+        return results, ambiguous
+
+    def match(self, query: str) -> List[Dict[str, str]]:
+        """질문에 등장한 종목 중 사전만으로 확정할 수 있는 종목을 등장 순서대로 중복 없이 반환"""
+        return self.resolve(query)[0]
+
+
+class ResolutionStats:
+    """종목 식별 경로(사전 매칭/LLM 대체)별 호출 횟수 집계"""
+
+    def __init__(self):
+        self.counter = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, path: str):
+        with self.lock:
+            self.counter[path] += 1
+            total = sum(self.counter.values())
+        logger.info(f"stock entity resolution path={path} ({self.counter[path]}/{total})")
+
+    def snapshot(self) -> Dict[str, object]:
+        with self.lock:
+            counts = dict(self.counter)
+        total = sum(counts.values())
+        return {
+            "total": total,
+            "counts": counts,
+            "ratios": {path: round(count / total, 4) for path, count in counts.items()} if total else {},
+        }
+
+
+resolution_stats = ResolutionStats()
+
+_resolver: Optional[StockEntityResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_stock_resolver() -> StockEntityResolver:
+    """종목 인덱스 버전이 바뀌면 다시 생성되는 공용 종목 식별기"""
+    global _resolver
+    listing_index = get_listing_index()
+    if _resolver is None or _resolver.version != listing_index.version:
+        with _resolver_lock:
+            if _resolver is None or _resolver.version != listing_index.version:
+                _resolver = StockEntityResolver(listing_index)
+    return _resolver
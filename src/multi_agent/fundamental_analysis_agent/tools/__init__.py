@@ -1,3 +1,4 @@
 from .dart import AnalysisFinancialStatementTool
+from .warehouse import ScreenFinancialRatioTool
 
-__all__ = ["AnalysisFinancialStatementTool"]
\ No newline at end of file
+__all__ = ["AnalysisFinancialStatementTool", "ScreenFinancialRatioTool"]
\ No newline at end of file
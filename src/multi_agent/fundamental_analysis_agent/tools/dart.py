@@ -6,11 +6,75 @@ from langchain_core.callbacks import (
 )
 from langchain_core.runnables import RunnableConfig
 from pydantic import BaseModel, Field
-import OpenDartReader
+import pandas as pd
+import requests
 import dotenv
 import os
 import json
+import asyncio
 from datetime import datetime
+from multi_agent.listing import get_listing_index
+from .ratios import ACCOUNT_IDS, PERIODS, compute_ratios, format_ratios, format_yoy
+
+
+DART_CACHE_DIR = os.getenv("DART_CACHE_DIR", os.path.join(".cache", "dart"))
+ANNUAL_REPORT_CODE = "11011"  # 사업보고서
+DART_FINSTATE_ALL_URL = "https://opendart.fss.or.kr/api/fnlttSinglAcntAll.json"
+DART_REQUEST_TIMEOUT = 10
+
+
+class DartClient:
+    """로컬 종목 인덱스의 corp_code 목록으로 DART 단일회사 전체 재무제표 API를 호출하는 클라이언트
+
+    OpenDartReader 생성자는 매일 DART 고유번호 전체 목록을 내려받으므로, 이미 가진 목록을 주입받아 필요한 엔드포인트만 직접 호출합니다.
+    """
+
+    def __init__(self, api_key: str, corp_codes: pd.DataFrame):
+        self.api_key = api_key
+        self.corp_codes = dict(zip(corp_codes["stock_code"].tolist(), corp_codes["corp_code"].tolist()))
+
+    def finstate_all(self, stock_code: str, year: int, reprt_code: str = ANNUAL_REPORT_CODE, fs_div: str = "CFS") -> pd.DataFrame:
+        """OpenDartReader.finstate_all과 같은 형식의 DataFrame. 공시가 없으면 빈 DataFrame"""
+        corp_code = self.corp_codes.get(stock_code)
+        if corp_code is None:
+            raise ValueError(f'could not find "{stock_code}"')
+        params = {
+            "crtfc_key": self.api_key,
+            "corp_code": corp_code,
+            "bsns_year": year,
+            "reprt_code": reprt_code,  # "11011": 사업보고서
+            "fs_div": fs_div,  # "CFS": 연결재무제표, "OFS": 별도재무제표
+        }
+        res = requests.get(DART_FINSTATE_ALL_URL, params=params, timeout=DART_REQUEST_TIMEOUT)
+        res.raise_for_status()
+        return pd.DataFrame(res.json().get("list", []))
+
+
+class FinancialStatementCache:
+    """(종목, 사업연도, 보고서 코드) 단위 재무제표 디스크 캐시. 공시된 재무제표는 변하지 않으므로 만료가 없음"""
+
+    def __init__(self, cache_dir: str = DART_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, corp: str, year: int, reprt_code: str) -> str:
+        return os.path.join(self.cache_dir, f"{corp}_{year}_{reprt_code}.pkl")
+
+    def get(self, corp: str, year: int, reprt_code: str) -> Optional[pd.DataFrame]:
+        path = self._path(corp, year, reprt_code)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_pickle(path)
+        except Exception:
+            return None
+
+    def set(self, corp: str, year: int, reprt_code: str, df: pd.DataFrame):
+        # 임시 파일에 쓴 뒤 교체하여 동시 요청 시 깨진 파일이 읽히지 않도록 함
+        path = self._path(corp, year, reprt_code)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
 
 
 class AnalysisFinancialStatementInput(BaseModel):
@@ -22,163 +86,99 @@ class AnalysisFinancialStatementInput(BaseModel):
 class AnalysisFinancialStatementTool(BaseTool):
     name: str = "analize_financial_statements"
     description: str = (
-        "Analyzes company financial statements to calculate critical financial health metrics including current ratio, debt ratio, retained earnings ratio, capital impairment ratio, ordinary income, ordinary income margin, interest coverage ratio, and ROE."
+        "Analyzes company financial statements to calculate critical financial health metrics including current ratio, debt ratio, retained earnings ratio, capital impairment ratio, ordinary income, ordinary income margin, interest coverage ratio, and ROE. "
+        "Returns the current, prior and pre-prior fiscal periods together with year-over-year changes, so growth trends can be analyzed from a single call."
     )
     args_schema: Type[BaseModel] = AnalysisFinancialStatementInput
     return_direct: bool = False
 
-    dart: object
+    dart: Optional[object] = None
+    dart_version: Optional[str] = None
+    cache: FinancialStatementCache
+    max_years: int = 5
 
     def __init__(self):
-        super().__init__(dart=OpenDartReader(os.environ["OPEN_DART_API_KEY"]))
+        super().__init__(cache=FinancialStatementCache())
+
+    def get_dart(self) -> DartClient:
+        """로컬 종목 인덱스가 바뀌면 새 corp_code 목록으로 DART 클라이언트를 다시 생성"""
+        listing_index = get_listing_index()
+        if self.dart is None or self.dart_version != listing_index.version:
+            self.dart = DartClient(os.environ["OPEN_DART_API_KEY"], listing_index.corp_codes())
+            self.dart_version = listing_index.version
+        return self.dart
+
+    async def get_financial_statement(self, stock_code: str, year: int, reprt_code: str = ANNUAL_REPORT_CODE) -> Optional[pd.DataFrame]:
+        """캐시 우선으로 재무제표 조회. DART 호출은 이벤트 루프를 막지 않도록 스레드에서 실행"""
+        df = await asyncio.to_thread(self.cache.get, stock_code, year, reprt_code)
+        if df is not None:
+            return df
 
-    def calculater(self, financial_statement_all):
+        try:
+            dart = await asyncio.to_thread(self.get_dart)
+            df = await asyncio.to_thread(dart.finstate_all, stock_code, year, reprt_code)
+        except Exception:
+            return None
 
-        # # 55기 데이터 필터링 (제 55 기)
-        # df_55 = financial_statement_all[
-        #     financial_statement_all["thstrm_nm"] == "제 55 기"
-        # ]
-        df_55 = financial_statement_all.iloc[:]
-
-        # 사용할 계정 ID 목록 업데이트
-        financial_data = df_55[
-            df_55["account_id"].isin(
-                [
-                    "ifrs-full_CurrentAssets",
-                    "ifrs-full_CurrentLiabilities",
-                    "ifrs-full_Liabilities",
-                    "ifrs-full_Equity",
-                    "ifrs-full_SharePremium",
-                    "ifrs-full_RetainedEarnings",
-                    "ifrs-full_IssuedCapital",
-                    "dart_OperatingIncomeLoss",
-                    "dart_OtherGains",
-                    "dart_OtherLosses",
-                    "ifrs-full_ProfitLoss",
-                    "ifrs-full_Revenue",
-                    "ifrs-full_FinanceCosts",
-                ]
-            )
-        ]
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            # 아직 공시되지 않았을 수 있으므로 빈 결과는 캐시하지 않음
+            return None
 
-        # 계산을 위한 재무 데이터 딕셔너리 생성
-        financial_dict = financial_data.set_index("account_id")[
-            "thstrm_amount"
-        ].to_dict()
+        await asyncio.to_thread(self.cache.set, stock_code, year, reprt_code, df)
+        return df
 
-        # 계산을 위해 모든 값을 float로 변환
-        for key in financial_dict:
-            financial_dict[key] = float(financial_dict[key])
+    async def get_latest_financial_statement(self, stock_code: str) -> Optional[pd.DataFrame]:
+        """최근 max_years 연도를 동시에 조회하여 가장 최근 재무제표 반환"""
+        current_year = datetime.now().year
+        years = [current_year - offset for offset in range(self.max_years)]
+        results = await asyncio.gather(
+            *[self.get_financial_statement(stock_code, year) for year in years]
+        )
 
-        results_dict = {}
+        for df in results:
+            if df is not None:
+                return df
+        return None
 
-        # 계산 수행
-        # 1. 유동비율 = (유동자산 / 유동부채) * 100
-        try:
-            current_ratio = (
-                financial_dict["ifrs-full_CurrentAssets"]
-                / financial_dict["ifrs-full_CurrentLiabilities"]
-            ) * 100
-            results_dict["유동비율"] = f"{current_ratio:.2f}%"
-        except:
-            pass
-
-        # 2. 부채비율 = (부채총계 / 자본총계) * 100
-        try:
-            debt_ratio = (
-                financial_dict["ifrs-full_Liabilities"]
-                / financial_dict["ifrs-full_Equity"]
-            ) * 100
-            results_dict["부채비율"] = f"{debt_ratio:.2f}%"
-        except:
-            pass
-
-        # 3. 유보율 = (자본잉여금 + 이익잉여금) / 납입자본금 * 100
-        try:
-            reserve_ratio = (
-                (
-                    financial_dict["ifrs-full_SharePremium"]
-                    + financial_dict["ifrs-full_RetainedEarnings"]
-                )
-                / financial_dict["ifrs-full_IssuedCapital"]
-            ) * 100
-            results_dict["유보율"] = f"{reserve_ratio:.2f}%"
-        except:
-            pass
-
-        # 4. 자본잠식률 = {(자본금 - 자본총계) / 자본금} * 100
-        try:
-            capital_impairment_ratio = (
-                (
-                    financial_dict["ifrs-full_IssuedCapital"]
-                    - financial_dict["ifrs-full_Equity"]
-                )
-                / financial_dict["ifrs-full_IssuedCapital"]
-            ) * 100
-            results_dict["자본잠식률"] = f"{capital_impairment_ratio:.2f}%"
-        except:
-            pass
-
-        # 5. 경상이익 = 영업이익 + 영업외수익 - 영업외비용
-        try:
-            ordinary_income = (
-                financial_dict["dart_OperatingIncomeLoss"]
-                + financial_dict["dart_OtherGains"]
-                - financial_dict["dart_OtherLosses"]
-            )
-            results_dict["경상이익"] = f"{ordinary_income:.2f}원"
-        except:
-            pass
-
-        # 8. 매출액경상이익률 = 경상이익 / 매출액 * 100
-        try:
-            ordinary_income_ratio = (
-                ordinary_income / financial_dict["ifrs-full_Revenue"]
-            ) * 100
-            results_dict["매출액경상이익률"] = f"{ordinary_income_ratio:.2f}%"
-        except:
-            pass
-
-        # 9. 이자보상배율 = 영업이익 / 이자비용 * 100
-        try:
-            interest_coverage_ratio = (
-                financial_dict["dart_OperatingIncomeLoss"]
-                / financial_dict["ifrs-full_FinanceCosts"]
-            ) * 100
-            results_dict["이자보상배율"] = f"{interest_coverage_ratio:.2f}%"
-        except:
-            pass
-
-        # 10. 자기자본이익률 = 당기순이익 / 자본총액 * 100
-        try:
-            roe = (
-                financial_dict["ifrs-full_ProfitLoss"]
-                / financial_dict["ifrs-full_Equity"]
-            ) * 100
-            results_dict["자기자본이익률"] = f"{roe:.2f}%"
-        except:
-            pass
+    def calculater(self, financial_statement_all):
+        # 사용할 계정만 추출 (동일 계정이 여러 번 있으면 마지막 값 사용)
+        financial_data = financial_statement_all[
+            financial_statement_all["account_id"].isin(ACCOUNT_IDS)
+        ].drop_duplicates(subset="account_id", keep="last")
+
+        # 당기/전기/전전기 금액을 행으로 두고 한 번에 비율 계산
+        periods = [
+            period for period in PERIODS
+            if f"{period}_amount" in financial_data.columns
+        ]
+        amounts = financial_data.set_index("account_id")[
+            [f"{period}_amount" for period in periods]
+        ].T
+        amounts.index = periods
+        ratios = compute_ratios(amounts)
+
+        results_dict = {}
+        for period in periods:
+            period_ratios = format_ratios(ratios.loc[period])
+            if not period_ratios:
+                continue
+            name_column = f"{period}_nm"
+            if name_column in financial_data.columns and financial_data[name_column].notna().any():
+                period_ratios = {"기수": financial_data[name_column].dropna().iloc[0]} | period_ratios
+            results_dict[PERIODS[period]] = period_ratios
+
+        # 전년 대비 변화
+        if "thstrm" in periods and "frmtrm" in periods:
+            results_dict["전기 대비 변화"] = format_yoy(ratios.loc["thstrm"], ratios.loc["frmtrm"])
+        if "frmtrm" in periods and "bfefrmtrm" in periods:
+            results_dict["전전기 대비 전기 변화"] = format_yoy(ratios.loc["frmtrm"], ratios.loc["bfefrmtrm"])
 
         return results_dict
 
     def _run(
         self, stock_code: str, config: RunnableConfig, run_manager: Optional[CallbackManagerForToolRun] = None
     ):
-        current_year = datetime.now().year
-        financial_statement_all = None
-
-        for offset in range(5):
-            year = current_year - offset
-            df = self.dart.finstate_all(stock_code, year)
-            if df is not None and not df.empty:
-                financial_statement_all = df
-                break
-
-        if financial_statement_all is None or financial_statement_all.empty:
-            return {"error": "최근 5년 내 재무제표를 찾지 못했습니다."}
-
-        analysis_result = self.calculater(financial_statement_all)
-        return analysis_result
+        return asyncio.run(self._arun(stock_code, config, run_manager))
 
     async def _arun(
         self,
@@ -186,6 +186,10 @@ class AnalysisFinancialStatementTool(BaseTool):
         config: RunnableConfig,
         run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
     ):
-        result = self._run(stock_code, config, run_manager)
+        financial_statement_all = await self.get_latest_financial_statement(stock_code)
+
+        if financial_statement_all is None:
+            return {"error": f"최근 {self.max_years}년 내 재무제표를 찾지 못했습니다."}
 
-        return result
+        analysis_result = self.calculater(financial_statement_all)
+        return analysis_result
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+
+# 재무비율 계산에 사용하는 계정 ID 목록
+ACCOUNT_IDS = [
+    "ifrs-full_CurrentAssets",
+    "ifrs-full_CurrentLiabilities",
+    "ifrs-full_Liabilities",
+    "ifrs-full_Equity",
+    "ifrs-full_SharePremium",
+    "ifrs-full_RetainedEarnings",
+    "ifrs-full_IssuedCapital",
+    "dart_OperatingIncomeLoss",
+    "dart_OtherGains",
+    "dart_OtherLosses",
+    "ifrs-full_ProfitLoss",
+    "ifrs-full_Revenue",
+    "ifrs-full_FinanceCosts",
+]
+
+# finstate_all의 기간별 금액 컬럼 접두어
+PERIODS = {
+    "thstrm": "당기",
+    "frmtrm": "전기",
+    "bfefrmtrm": "전전기",
+}
+
+RATIO_UNITS = {
+    "유동비율": "%",
+    "부채비율": "%",
+    "유보율": "%",
+    "자본잠식률": "%",
+    "경상이익": "원",
+    "매출액경상이익률": "%",
+    "이자보상배율": "%",
+    "자기자본이익률": "%",
+}
+
+
+def compute_ratios(amounts: pd.DataFrame) -> pd.DataFrame:
+    """account_id를 컬럼으로 갖는 금액 테이블에서 모든 행의 재무비율을 한 번에 계산
+
+    계산에 필요한 계정이 없거나 분모가 0인 경우 해당 비율은 NaN이 됩니다.
+    """
+    a = amounts.reindex(columns=ACCOUNT_IDS).apply(pd.to_numeric, errors="coerce")
+
+    # 5. 경상이익 = 영업이익 + 영업외수익 - 영업외비용
+    ordinary_income = a["dart_OperatingIncomeLoss"] + a["dart_OtherGains"] - a["dart_OtherLosses"]
+
+    ratios = pd.DataFrame(
+        {
+            # 1. 유동비율 = (유동자산 / 유동부채) * 100
+            "유동비율": a["ifrs-full_CurrentAssets"] / a["ifrs-full_CurrentLiabilities"] * 100,
+            # 2. 부채비율 = (부채총계 / 자본총계) * 100
+            "부채비율": a["ifrs-full_Liabilities"] / a["ifrs-full_Equity"] * 100,
+            # 3. 유보율 = (자본잉여금 + 이익잉여금) / 납입자본금 * 100
+            "유보율": (a["ifrs-full_SharePremium"] + a["ifrs-full_RetainedEarnings"]) / a["ifrs-full_IssuedCapital"] * 100,
+            # 4. 자본잠식률 = {(자본금 - 자본총계) / 자본금} * 100
+            "자본잠식률": (a["ifrs-full_IssuedCapital"] - a["ifrs-full_Equity"]) / a["ifrs-full_IssuedCapital"] * 100,
+            "경상이익": ordinary_income,
+            # 8. 매출액경상이익률 = 경상이익 / 매출액 * 100
+            "매출액경상이익률": ordinary_income / a["ifrs-full_Revenue"] * 100,
+            # 9. 이자보상배율 = 영업이익 / 이자비용 * 100
+            "이자보상배율": a["dart_OperatingIncomeLoss"] / a["ifrs-full_FinanceCosts"] * 100,
+            # 10. 자기자본이익률 = 당기순이익 / 자본총액 * 100
+            "자기자본이익률": a["ifrs-full_ProfitLoss"] / a["ifrs-full_Equity"] * 100,
+        },
+        index=amounts.index,
+    )
+    return ratios.replace([np.inf, -np.inf], np.nan)
+
+
+def format_ratios(ratios: pd.Series) -> dict:
+    """계산된 비율 한 행을 '12.34%' 형식의 딕셔너리로 변환 (NaN은 제외)"""
+    return {
+        name: f"{value:.2f}{RATIO_UNITS[name]}"
+        for name, value in ratios.items()
+        if pd.notna(value)
+    }
+
+
+def format_yoy(current: pd.Series, prior: pd.Series) -> dict:
+    """전기 대비 변화 계산. 비율은 %p 차이, 금액(원)은 증감률(%)로 표시"""
+    result = {}
+    for name, unit in RATIO_UNITS.items():
+        if pd.isna(current.get(name)) or pd.isna(prior.get(name)):
+            continue
+        if unit == "%":
+            result[name] = f"{current[name] - prior[name]:+.2f}%p"
+        elif prior[name] != 0:
+            result[name] = f"{(current[name] - prior[name]) / abs(prior[name]) * 100:+.2f}%"
+    return result
@@ -0,0 +1,181 @@
+import os
+import asyncio
+from typing import Type, Optional, List, Dict, Iterable, Tuple
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+from langchain_core.tools import BaseTool
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForToolRun,
+)
+from langchain_core.runnables import RunnableConfig
+from .ratios import ACCOUNT_IDS, RATIO_UNITS, compute_ratios
+
+
+DART_WAREHOUSE_PATH = os.getenv("DART_WAREHOUSE_PATH", os.path.join(".cache", "dart_warehouse.parquet"))
+
+
+def to_long_table(statements: List[Tuple[str, int, pd.DataFrame]]) -> pd.DataFrame:
+    """finstate_all 결과 목록을 (stock_code, year, account_id, amount) 형태의 하나의 테이블로 변환 (당기 금액만 사용)"""
+    lengths = [len(df) for _, _, df in statements]
+    long = pd.DataFrame({
+        "stock_code": np.repeat([stock_code for stock_code, _, _ in statements], lengths),
+        "year": np.repeat([int(year) for _, year, _ in statements], lengths),
+        "account_id": np.concatenate([df["account_id"].to_numpy(dtype=object) for _, _, df in statements] or [[]]),
+        "amount": np.concatenate([df["thstrm_amount"].to_numpy(dtype=object) for _, _, df in statements] or [[]]),
+    })
+    long = long[long["account_id"].isin(ACCOUNT_IDS)]
+    # 동일 계정이 여러 재무제표에 있는 경우 calculater와 같이 마지막 값을 사용
+    long = long.drop_duplicates(subset=["stock_code", "year", "account_id"], keep="last")
+    long["amount"] = pd.to_numeric(long["amount"], errors="coerce")
+    return long
+
+
+class FinancialStatementWarehouse:
+    """전 종목 재무제표 금액과 재무비율을 (stock_code, year) 인덱스의 컬럼형 파일(parquet)로 보관"""
+
+    def __init__(self, path: str = DART_WAREHOUSE_PATH):
+        self.path = path
+        self._table: Optional[pd.DataFrame] = None
+        self._mtime: Optional[float] = None
+
+    def build(self, statements: Iterable[Tuple[str, int, pd.DataFrame]]) -> pd.DataFrame:
+        """(종목코드, 사업연도, finstate_all DataFrame) 목록으로 테이블을 만들고 저장"""
+        statements = [
+            (stock_code, year, df)
+            for stock_code, year, df in statements
+            if df is not None and not df.empty
+        ]
+        long = to_long_table(statements)
+
+        amounts = long.pivot(
+            index=["stock_code", "year"], columns="account_id", values="amount"
+        ).reindex(columns=ACCOUNT_IDS).astype(float)
+        table = pd.concat([amounts, compute_ratios(amounts)], axis=1).sort_index()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        table.to_parquet(tmp_path)
+        os.replace(tmp_path, self.path)
+
+        self._table = table
+        self._mtime = os.path.getmtime(self.path)
+        return table
+
+    def load(self) -> pd.DataFrame:
+        """저장된 테이블을 메모리에 적재 (파일이 갱신된 경우에만 다시 읽음)"""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"재무제표 저장소가 없습니다: {self.path}")
+
+        mtime = os.path.getmtime(self.path)
+        if self._table is None or self._mtime != mtime:
+            self._table = pd.read_parquet(self.path)
+            self._mtime = mtime
+        return self._table
+
+    def latest(self) -> pd.DataFrame:
+        """종목별 가장 최근 사업연도 행만 반환"""
+        table = self.load()
+        return table[~table.index.get_level_values("stock_code").duplicated(keep="last")]
+
+    def screen(
+        self,
+        sort_by: str = "자기자본이익률",
+        ascending: bool = False,
+        top_n: int = 20,
+        year: Optional[int] = None,
+        filters: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+    ) -> pd.DataFrame:
+        """재무비율 조건으로 종목 선별. filters는 {비율명: (최솟값, 최댓값)} 형식"""
+        if sort_by not in RATIO_UNITS:
+            raise ValueError(f"정렬 기준은 {list(RATIO_UNITS)} 중 하나여야 합니다")
+
+        if year is None:
+            table = self.latest()
+        else:
+            table = self.load().xs(year, level="year", drop_level=False)
+
+        mask = table[sort_by].notna()
+        for name, (min_value, max_value) in (filters or {}).items():
+            if name not in RATIO_UNITS:
+                raise ValueError(f"필터 비율은 {list(RATIO_UNITS)} 중 하나여야 합니다")
+            if min_value is not None:
+                mask &= table[name] >= min_value
+            if max_value is not None:
+                mask &= table[name] <= max_value
+
+        return table.loc[mask, list(RATIO_UNITS)].sort_values(sort_by, ascending=ascending).head(top_n)
+
+
+class RatioFilter(BaseModel):
+    ratio: str = Field(description=f"Ratio name, one of {list(RATIO_UNITS)}")
+    min_value: Optional[float] = Field(default=None, description="Minimum value (inclusive)")
+    max_value: Optional[float] = Field(default=None, description="Maximum value (inclusive)")
+
+
+class ScreenFinancialRatioInput(BaseModel):
+    sort_by: str = Field(
+        default="자기자본이익률",
+        description=f"Ratio to rank companies by, one of {list(RATIO_UNITS)}"
+    )
+    ascending: bool = Field(default=False, description="Sort ascending if true")
+    top_n: int = Field(default=20, ge=1, le=100, description="Number of companies to return")
+    year: Optional[int] = Field(default=None, description="Fiscal year. Latest available year per company if omitted")
+    filters: List[RatioFilter] = Field(
+        default_factory=list,
+        description="Ratio range conditions (e.g. 부채비율 max_value 100)"
+    )
+
+
+class ScreenFinancialRatioTool(BaseTool):
+    name: str = "screen_financial_ratios"
+    description: str = (
+        "Screens all KRX listed companies by financial ratios (current ratio, debt ratio, retained earnings ratio, capital impairment ratio, ordinary income, ordinary income margin, interest coverage ratio, ROE) "
+        "from a locally stored DART financial statement warehouse. Use it for ranking or filtering many companies at once, e.g. top 20 by ROE with debt ratio below 100%."
+    )
+    args_schema: Type[BaseModel] = ScreenFinancialRatioInput
+    return_direct: bool = False
+
+    warehouse: FinancialStatementWarehouse
+
+    def __init__(self):
+        super().__init__(warehouse=FinancialStatementWarehouse())
+
+    def _run(
+        self,
+        sort_by: str = "자기자본이익률",
+        ascending: bool = False,
+        top_n: int = 20,
+        year: Optional[int] = None,
+        filters: Optional[List] = None,
+        config: RunnableConfig = None,
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ):
+        try:
+            filter_dict = {}
+            for f in filters or []:
+                f = RatioFilter.model_validate(f)
+                filter_dict[f.ratio] = (f.min_value, f.max_value)
+
+            result = self.warehouse.screen(sort_by, ascending, top_n, year, filter_dict)
+        except (FileNotFoundError, ValueError, KeyError) as e:
+            return {"error": str(e)}
+
+        result = result.round(2).reset_index()
+        return result.astype(object).where(result.notna(), None).to_dict(orient="records")
+
+    async def _arun(
+        self,
+        sort_by: str = "자기자본이익률",
+        ascending: bool = False,
+        top_n: int = 20,
+        year: Optional[int] = None,
+        filters: Optional[List] = None,
+        config: RunnableConfig = None,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ):
+        # 최초 호출 시 parquet 파일 읽기가 있을 수 있으므로 스레드에서 실행
+        return await asyncio.to_thread(
+            self._run, sort_by, ascending, top_n, year, filters, config, run_manager
+        )
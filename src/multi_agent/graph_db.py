@@ -0,0 +1,52 @@
+import os
+import logging
+from typing import Optional
+from neo4j import AsyncGraphDatabase, AsyncDriver
+from neo4j.exceptions import Neo4jError
+
+logger = logging.getLogger(__name__)
+
+# 종목/날짜로 시작하는 Cypher(서브그래프, Cypher 라이브러리)가 사용하는 인덱스
+GRAPH_INDEXES = [
+    "CREATE INDEX company_stock_name IF NOT EXISTS FOR (c:Company) ON (c.stock_name)",
+    "CREATE INDEX date_date IF NOT EXISTS FOR (d:Date) ON (d.date)",
+]
+# 종목코드는 고유 제약조건으로 생성하고, 기존 데이터에 중복이 있어 실패하면 일반 인덱스로 대체
+COMPANY_STOCK_CODE_CONSTRAINT = "CREATE CONSTRAINT company_stock_code IF NOT EXISTS FOR (c:Company) REQUIRE c.stock_code IS UNIQUE"
+COMPANY_STOCK_CODE_INDEX = "CREATE INDEX company_stock_code_index IF NOT EXISTS FOR (c:Company) ON (c.stock_code)"
+
+
+_driver: Optional[AsyncDriver] = None
+
+
+def get_neo4j_driver() -> AsyncDriver:
+    """애플리케이션 공용 비동기 Neo4j 드라이버 (커넥션 풀 공유)"""
+    global _driver
+    if _driver is None:
+        _driver = AsyncGraphDatabase.driver(
+            os.getenv("NEO4J_URI"),
+            auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD")),
+            max_connection_pool_size=int(os.getenv("NEO4J_MAX_POOL_SIZE", "50")),
+            connection_acquisition_timeout=float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "10")),
+        )
+    return _driver
+
+
+async def close_neo4j_driver():
+    """서버 종료 시 드라이버 정리"""
+    global _driver
+    if _driver is not None:
+        await _driver.close()
+        _driver = None
+
+
+async def ensure_graph_indexes():
+    """지식 그래프 조회에 필요한 인덱스/제약조건 생성 (이미 있으면 무시)"""
+    async with get_neo4j_driver().session() as session:
+        for statement in GRAPH_INDEXES:
+            await (await session.run(statement)).consume()
+        try:
+            await (await session.run(COMPANY_STOCK_CODE_CONSTRAINT)).consume()
+        except Neo4jError as e:
+            logger.warning(f"Company.stock_code unique constraint failed, creating plain index instead: {e}")
+            await (await session.run(COMPANY_STOCK_CODE_INDEX)).consume()
@@ -1,11 +1,10 @@
-import os
 import json
 import requests
 import httpx
 import asyncio
 from dotenv import load_dotenv
 from typing import Type, Optional, ClassVar
-from langchain_openai import ChatOpenAI
+from ...web_search import WebSearch, get_web_search
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import (
     AsyncCallbackManagerForToolRun,
@@ -27,11 +26,8 @@ class InvestmentStrategySearchTool(BaseTool):
     args_schema: Type[BaseModel] = InvestmentStrategySearchInput
     return_direct: bool = False
 
-    llm: ClassVar[ChatOpenAI] = ChatOpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        model="perplexity/sonar",
-        api_key=os.getenv("OPENROUTER_API_KEY")
-    )
+    # 같은 질의는 캐시 결과를 쓰고, 동시에 들어온 같은 질의는 한 번만 검색
+    web_search: ClassVar[WebSearch] = get_web_search()
 
     def _run(self, query: str, config: RunnableConfig, run_manager: Optional[CallbackManagerForToolRun] = None):
         return asyncio.run(self._arun(query, config, run_manager))
@@ -42,6 +38,4 @@ class InvestmentStrategySearchTool(BaseTool):
         config: RunnableConfig,
         run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
     ):
-        response = await self.llm.ainvoke(query)
-
-        return response.content
+        return await self.web_search.search(query)
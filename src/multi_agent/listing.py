@@ -0,0 +1,152 @@
+import os
+import json
+import shutil
+import threading
+from datetime import datetime
+from functools import cached_property
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+
+LISTING_DIR = os.getenv("LISTING_DIR", os.path.join(".cache", "listing"))
+LISTING_KEEP_VERSIONS = 3
+
+
+class ListingIndex:
+    """종목코드 ↔ 종목명 ↔ DART 고유번호(corp_code) ↔ 시장/업종 인덱스
+
+    버전별 디렉터리에 컬럼마다 고정폭 문자열 .npy 파일로 저장하고, 로딩 시 메모리 맵으로 엽니다.
+    """
+
+    COLUMNS = ["stock_code", "stock_name", "corp_code", "market", "sector"]
+
+    def __init__(self, version: str, arrays: Dict[str, np.ndarray]):
+        self.version = version
+        self.arrays = arrays
+
+    def __len__(self):
+        return len(self.arrays["stock_code"])
+
+    @staticmethod
+    def current_version(listing_dir: str = LISTING_DIR) -> Optional[str]:
+        path = os.path.join(listing_dir, "CURRENT")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read().strip() or None
+
+    @classmethod
+    def load(cls, listing_dir: str = LISTING_DIR) -> Optional["ListingIndex"]:
+        """CURRENT가 가리키는 버전의 인덱스를 메모리 맵으로 로딩 (없으면 None)"""
+        version = cls.current_version(listing_dir)
+        if version is None:
+            return None
+
+        version_dir = os.path.join(listing_dir, version)
+        arrays = {
+            column: np.load(os.path.join(version_dir, f"{column}.npy"), mmap_mode="r")
+            for column in cls.COLUMNS
+        }
+        return cls(version, arrays)
+
+    @classmethod
+    def save(cls, listing: pd.DataFrame, listing_dir: str = LISTING_DIR) -> "ListingIndex":
+        """종목 목록을 새 버전으로 저장하고 CURRENT를 교체"""
+        version = datetime.now().strftime("%Y%m%d%H%M%S")
+        version_dir = os.path.join(listing_dir, version)
+        os.makedirs(version_dir, exist_ok=True)
+
+        listing = listing.sort_values("stock_code").reset_index(drop=True)
+        for column in cls.COLUMNS:
+            values = listing[column].fillna("").astype(str).to_numpy(dtype=str)
+            np.save(os.path.join(version_dir, f"{column}.npy"), values)
+
+        with open(os.path.join(version_dir, "meta.json"), "w") as f:
+            json.dump({"version": version, "count": len(listing)}, f)
+
+        # CURRENT 교체는 원자적으로 수행
+        tmp_path = os.path.join(listing_dir, f"CURRENT.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(listing_dir, "CURRENT"))
+
+        # 오래된 버전 정리
+        versions = sorted(
+            d for d in os.listdir(listing_dir)
+            if os.path.isdir(os.path.join(listing_dir, d))
+        )
+        for old_version in versions[:-LISTING_KEEP_VERSIONS]:
+            shutil.rmtree(os.path.join(listing_dir, old_version), ignore_errors=True)
+
+        return cls.load(listing_dir)
+
+    @classmethod
+    def refresh(cls, dart_api_key: str, listing_dir: str = LISTING_DIR) -> "ListingIndex":
+        """KRX 상장 종목과 DART 고유번호를 내려받아 새 버전의 인덱스를 생성"""
+        import FinanceDataReader as fdr
+        import OpenDartReader
+
+        krx = fdr.StockListing('KRX')[["Code", "Name", "Market"]]
+        desc = fdr.StockListing('KRX-DESC')[["Code", "Sector"]]
+        corp_codes = OpenDartReader(dart_api_key).corp_codes
+        corp_codes = corp_codes[corp_codes["stock_code"].fillna("").str.strip() != ""]
+
+        listing = (
+            krx.merge(desc, on="Code", how="left")
+            .merge(corp_codes[["stock_code", "corp_code"]], left_on="Code", right_on="stock_code", how="left")
+            .drop(columns=["stock_code"])
+            .rename(columns={"Code": "stock_code", "Name": "stock_name", "Market": "market", "Sector": "sector"})
+            .drop_duplicates(subset="stock_code")
+        )
+        return cls.save(listing, listing_dir)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({column: np.asarray(self.arrays[column]) for column in self.COLUMNS})
+
+    @cached_property
+    def name_to_code(self) -> Dict[str, str]:
+        return dict(zip(self.arrays["stock_name"].tolist(), self.arrays["stock_code"].tolist()))
+
+    @cached_property
+    def code_to_row(self) -> Dict[str, int]:
+        return {code: i for i, code in enumerate(self.arrays["stock_code"].tolist())}
+
+    def find_by_code(self, stock_code: str) -> Optional[Dict[str, str]]:
+        row = self.code_to_row.get(stock_code)
+        if row is None:
+            return None
+        return {column: str(self.arrays[column][row]) for column in self.COLUMNS}
+
+    def find_by_name(self, stock_name: str) -> Optional[Dict[str, str]]:
+        stock_code = self.name_to_code.get(stock_name)
+        return None if stock_code is None else self.find_by_code(stock_code)
+
+    def corp_codes(self) -> pd.DataFrame:
+        """OpenDartReader.corp_codes 형식 (corp_code, corp_name, stock_code)의 DataFrame"""
+        df = self.to_frame()
+        df = df[df["corp_code"] != ""]
+        return df.rename(columns={"stock_name": "corp_name"})[["corp_code", "corp_name", "stock_code"]].reset_index(drop=True)
+
+
+_listing_index: Optional[ListingIndex] = None
+_listing_lock = threading.Lock()
+
+
+def get_listing_index() -> ListingIndex:
+    """애플리케이션 공용 종목 인덱스. 배치 작업이 새 버전을 만들면 다음 호출에서 교체됨
+
+    로컬 인덱스가 아직 없으면 최초 1회만 원격에서 내려받아 생성합니다.
+    """
+    global _listing_index
+    version = ListingIndex.current_version()
+    if _listing_index is not None and _listing_index.version == version:
+        return _listing_index
+
+    with _listing_lock:
+        if _listing_index is None or _listing_index.version != ListingIndex.current_version():
+            listing_index = ListingIndex.load()
+            if listing_index is None:
+                listing_index = ListingIndex.refresh(os.environ["OPEN_DART_API_KEY"])
+            _listing_index = listing_index
+    return _listing_index
@@ -1,17 +1,30 @@
 from .agent import MarketAnalysisAgent
 from .prompt import SYSTEM_TEMPLATE
-from .tools import *
 
 
-agent = MarketAnalysisAgent(
-    model="gpt-4o-mini",
-    tools=[
-        SearchNewsTool(),
-        SearchReportTool(),
-        YouTubeSearchTool(),
-        ReportSentimentAnalysisTool(),
-        GraphQATool(),
-    ],
-    system=SYSTEM_TEMPLATE,
-    name="MarketAnalysisAgent",
-)
\ No newline at end of file
+def build_agent():
+    from .tools import SearchNewsTool, SearchReportTool, SearchReportPassagesTool, YouTubeSearchTool, ReportSentimentAnalysisTool, GraphQATool, CompetitorComparisonTool
+
+    return MarketAnalysisAgent(
+        model="gpt-4o-mini",
+        tools=[
+            SearchNewsTool(),
+            SearchReportTool(),
+            SearchReportPassagesTool(),
+            YouTubeSearchTool(),
+            ReportSentimentAnalysisTool(),
+            GraphQATool(),
+            CompetitorComparisonTool(),
+        ],
+        system=SYSTEM_TEMPLATE,
+        name="MarketAnalysisAgent",
+    )
+
+
+def __getattr__(name):
+    # 하위 모듈(tools 등)만 import할 때는 에이전트와 도구(외부 연결 포함)를 만들지 않도록 최초 접근 시 생성
+    global agent
+    if name == "agent":
+        agent = build_agent()
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,8 @@
 from .news import SearchNewsTool
-from .report import SearchReportTool
+from .report import SearchReportTool, SearchReportPassagesTool
 from .youtube_tool import YouTubeSearchTool
 from .sentiment import ReportSentimentAnalysisTool
 from .graph_qa import GraphQATool
+from .competitors import CompetitorComparisonTool
 
-__all__ = ["SearchNewsTool", "SearchReportTool", "YouTubeSearchTool", "ReportSentimentAnalysisTool", "GraphQATool"]
\ No newline at end of file
+__all__ = ["SearchNewsTool", "SearchReportTool", "SearchReportPassagesTool", "YouTubeSearchTool", "ReportSentimentAnalysisTool", "GraphQATool", "CompetitorComparisonTool"]
\ No newline at end of file
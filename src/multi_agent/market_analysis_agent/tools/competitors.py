@@ -0,0 +1,125 @@
+import asyncio
+from typing import Optional, Type
+from pydantic import BaseModel, Field
+from langchain_core.tools import BaseTool
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForToolRun,
+)
+from langchain_core.runnables import RunnableConfig
+from ...graph_db import get_neo4j_driver
+from ...listing import get_listing_index
+
+
+INDICATOR_FIELDS = ["eps", "bps", "per", "pbr"]
+FINANCIAL_STATEMENT_FIELDS = [
+    "revenue", "operating_income", "net_income", "total_assets", "total_liabilities", "total_capital", "capital_stock",
+]
+
+# 기준 종목과 모든 경쟁사를 UNWIND로 펼쳐 한 번의 쿼리로 지표/재무제표/최근 주가를 조회
+# Indicator/FinancialStatements에는 기준일 속성이 없고 종목당 최신 스냅샷 하나만 연결되므로 정렬 없이 한 건만 사용
+COMPETITOR_METRICS_QUERY = """
+MATCH (c:Company {stock_name: $stock_name})
+OPTIONAL MATCH (c)-[:HAS_COMPETITOR]->(o:Company)
+WITH c, collect(DISTINCT o) as competitors
+UNWIND [c] + competitors as company
+CALL (company) {
+    OPTIONAL MATCH (company)-[:HAS_INDICATOR]->(i:Indicator)
+    RETURN head(collect(i {.eps, .bps, .per, .pbr})) as indicator
+}
+CALL (company) {
+    OPTIONAL MATCH (company)-[:HAS_FINANCIAL_STATEMENTS]->(f:FinancialStatements)
+    RETURN head(collect(f {.revenue, .operating_income, .net_income, .total_assets, .total_liabilities, .total_capital, .capital_stock})) as financial_statements
+}
+CALL (company) {
+    OPTIONAL MATCH (company)-[:HAS_STOCK_PRICE]->(p:StockPrice)
+    WITH p ORDER BY p.date DESC LIMIT $price_days
+    RETURN collect(p {.date, .close, .volume}) as prices
+}
+RETURN company.stock_name as stock_name,
+       company.stock_code as stock_code,
+       company = c as is_target,
+       company.marcap as marcap,
+       indicator,
+       financial_statements,
+       prices
+ORDER BY is_target DESC, marcap DESC
+"""
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_comparison_row(record) -> dict:
+    """쿼리 결과 한 행을 종목별 비교표의 한 행으로 변환"""
+    indicator = record["indicator"] or {}
+    financial_statements = record["financial_statements"] or {}
+    prices = record["prices"]
+
+    row = {
+        "stock_name": record["stock_name"],
+        "stock_code": record["stock_code"],
+        "is_target": record["is_target"],
+        "marcap": record["marcap"],
+    }
+    row.update({field: indicator.get(field) for field in INDICATOR_FIELDS})
+    row.update({field: financial_statements.get(field) for field in FINANCIAL_STATEMENT_FIELDS})
+
+    # 최근 주가는 최신순으로 조회되므로 비교표에는 과거 → 최신 순으로 기록
+    closes = [_to_float(price.get("close")) for price in reversed(prices)]
+    closes = [close for close in closes if close is not None]
+    row["latest_date"] = str(prices[0]["date"]) if prices else None
+    row["latest_close"] = closes[-1] if closes else None
+    row["recent_closes"] = closes
+    row["return_pct"] = round((closes[-1] / closes[0] - 1) * 100, 2) if len(closes) > 1 and closes[0] else None
+    return row
+
+
+class CompetitorComparisonInput(BaseModel):
+    stock_name: str = Field(description="Company name (or 6-digit stock code) to compare with its competitors")
+    price_days: int = Field(default=5, ge=1, le=60, description="Number of most recent daily prices per company")
+
+
+class CompetitorComparisonTool(BaseTool):
+    name: str = "compare_competitors"
+    description: str = (
+        "Compares a company with all of its competitors in the financial knowledge graph in one query. "
+        "Returns a table with one row per company: market cap, latest indicators (EPS, BPS, PER, PBR), "
+        "financial statements (revenue, operating income, net income, assets, liabilities, capital) and recent closing prices with return."
+    )
+    args_schema: Type[BaseModel] = CompetitorComparisonInput
+    return_direct: bool = False
+
+    def _run(
+        self,
+        stock_name: str,
+        price_days: int = 5,
+        config: RunnableConfig = None,
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ):
+        """동기 메서드는 비동기 메서드를 실행"""
+        return asyncio.run(self._arun(stock_name, price_days, config, run_manager))
+
+    async def _arun(
+        self,
+        stock_name: str,
+        price_days: int = 5,
+        config: RunnableConfig = None,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ):
+        # 종목코드로 들어온 경우 종목명으로 변환 (그래프는 종목명으로 조회)
+        stock = get_listing_index().find_by_code(stock_name.strip())
+        if stock is not None:
+            stock_name = stock["stock_name"]
+
+        async with get_neo4j_driver().session() as session:
+            result = await session.run(COMPETITOR_METRICS_QUERY, stock_name=stock_name, price_days=price_days)
+            records = [record async for record in result]
+
+        if not records:
+            return {"error": f"지식 그래프에서 '{stock_name}' 종목을 찾을 수 없습니다."}
+        return [to_comparison_row(record) for record in records]
@@ -0,0 +1,110 @@
+import re
+from typing import Dict, Optional, Tuple
+from ...entity_resolution import PARTICLES
+
+
+LIBRARY_RESULT_LIMIT = 20
+
+# 자주 들어오는 질문 형태별 파라미터화된 Cypher (custom_schema 기준)
+# keywords는 종목명/날짜를 자리표시자로 바꾼 질문 형태에서 온전한 단어(조사 허용)로 찾고, 질문에 날짜가 있으면 range_query를 사용
+# Date.date는 Neo4j date 타입일 수 있으므로 빌드 스크립트와 같이 toString으로 바꿔 "YYYY-MM-DD" 문자열 파라미터와 비교
+CYPHER_LIBRARY = {
+    "competitors": {
+        "keywords": ["경쟁사", "경쟁 업체", "경쟁업체", "경쟁 기업", "경쟁기업", "라이벌", "competitor", "competitors"],
+        "query": """
+        MATCH (c:Company {stock_name: $stock_name})-[:HAS_COMPETITOR]->(o:Company)
+        RETURN o.stock_name as stock_name, o.stock_code as stock_code, o.market as market, o.marcap as marcap
+        ORDER BY o.marcap DESC
+        LIMIT $limit
+        """,
+    },
+    "sector_peers": {
+        "keywords": ["업종", "동종", "섹터", "sector", "peer", "peers"],
+        "query": """
+        MATCH (c:Company {stock_name: $stock_name})-[:BELONGS_TO]->(s:Sector)<-[:BELONGS_TO]-(p:Company)
+        WHERE p <> c
+        RETURN s.sector as sector, p.stock_name as stock_name, p.stock_code as stock_code, p.marcap as marcap
+        ORDER BY p.marcap DESC
+        LIMIT $limit
+        """,
+    },
+    "stock_price": {
+        "keywords": ["주가", "종가", "시가", "고가", "저가", "거래량", "현재가"],
+        "query": """
+        MATCH (c:Company {stock_name: $stock_name})-[:HAS_STOCK_PRICE]->(p:StockPrice)
+        RETURN p {.*} as stock_price
+        ORDER BY p.date DESC
+        LIMIT 1
+        """,
+        "range_query": """
+        MATCH (d:Date) WHERE toString(d.date) >= $start_date AND toString(d.date) <= $end_date
+        MATCH (c:Company {stock_name: $stock_name})-[:HAS_STOCK_PRICE]->(p:StockPrice)-[:RECORDED_ON]->(d)
+        RETURN p {.*} as stock_price
+        ORDER BY d.date DESC
+        LIMIT $limit
+        """,
+    },
+    "financial_statements": {
+        "keywords": ["재무", "재무제표", "재무정보", "매출", "매출액", "영업이익", "순이익", "당기순이익", "총자산", "부채", "자본금", "자본총계"],
+        "query": """
+        MATCH (c:Company {stock_name: $stock_name})-[:HAS_FINANCIAL_STATEMENTS]->(f:FinancialStatements)
+        RETURN f {.*} as financial_statements
+        """,
+    },
+    "news": {
+        "keywords": ["뉴스", "기사", "소식", "news"],
+        "query": """
+        MATCH (n:News)-[:MENTIONS_STOCKS]->(c:Company {stock_name: $stock_name})
+        RETURN n.date as date, n.title as title, left(n.body, 300) as body
+        ORDER BY n.date DESC
+        LIMIT $limit
+        """,
+        "range_query": """
+        MATCH (d:Date) WHERE toString(d.date) >= $start_date AND toString(d.date) <= $end_date
+        MATCH (n:News)-[:PUBLISHED_ON]->(d)
+        MATCH (n)-[:MENTIONS_STOCKS]->(c:Company {stock_name: $stock_name})
+        RETURN d.date as date, n.title as title, left(n.body, 300) as body
+        ORDER BY d.date DESC
+        LIMIT $limit
+        """,
+    },
+}
+
+
+_PARTICLE_PATTERN = "|".join(sorted((re.escape(particle) for particle in PARTICLES), key=len, reverse=True))
+# '시가'가 '시가총액' 안에서 매칭되지 않도록 단어 경계에서만 인정 (키워드 뒤 조사는 허용)
+_KEYWORD_PATTERNS = {
+    name: re.compile(
+        r"(?<![가-힣0-9a-z])(?:" + "|".join(re.escape(keyword) for keyword in entry["keywords"]) + r")"
+        r"(?:" + _PARTICLE_PATTERN + r")?(?![가-힣0-9a-z])"
+    )
+    for name, entry in CYPHER_LIBRARY.items()
+}
+
+
+def match_intent(shape: str, params: Dict[str, str]) -> Optional[Tuple[str, str, Dict[str, object]]]:
+    """질문 형태가 라이브러리의 의도 하나에만 해당하고 종목이 하나일 때 (의도, Cypher, 파라미터) 반환
+
+    shape, params는 graph_qa.abstract_question의 결과를 사용합니다. 해당하지 않으면 None을 반환하여 LLM 체인으로 넘깁니다.
+    """
+    if "stock_name_0" not in params or "stock_name_1" in params:
+        return None
+
+    intents = [name for name, pattern in _KEYWORD_PATTERNS.items() if pattern.search(shape)]
+    if len(intents) != 1:
+        return None
+
+    intent = intents[0]
+    entry = CYPHER_LIBRARY[intent]
+    query_params = {"stock_name": params["stock_name_0"], "limit": LIBRARY_RESULT_LIMIT}
+
+    dates = sorted(value for name, value in params.items() if name.startswith("date_"))
+    if not dates:
+        return intent, entry["query"], query_params
+    if "range_query" not in entry:
+        return None
+
+    # YYYY-MM은 해당 월 전체로 해석 (문자열 비교이므로 말일은 31로 둠)
+    query_params["start_date"] = dates[0] if len(dates[0]) == 10 else f"{dates[0]}-01"
+    query_params["end_date"] = dates[-1] if len(dates[-1]) == 10 else f"{dates[-1]}-31"
+    return intent, entry["range_query"], query_params
@@ -1,9 +1,11 @@
 import dotenv
 import os
+import re
 import asyncio
+import logging
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
-from typing import Type
+from typing import Dict, List, Tuple, Type
 from langchain_community.graphs import Neo4jGraph
 from langchain.chains import GraphCypherQAChain
 from langchain_openai import ChatOpenAI
@@ -13,7 +15,74 @@ from langchain_core.callbacks import (
 )
 from langchain_core.runnables import RunnableConfig
 from typing import Optional
-import dotenv
+from neo4j.exceptions import Neo4jError
+from ...cache import TTLCache
+from ...entity_resolution import get_stock_resolver
+from ...graph_db import get_neo4j_driver
+from .cypher_library import match_intent
+
+logger = logging.getLogger(__name__)
+
+_DATE_PATTERN = re.compile(r"(?<!\d)\d{4}-\d{2}(?:-\d{2})?(?!\d)")
+# 캐시할 템플릿은 조회 전용이어야 함
+_WRITE_CLAUSE = re.compile(
+    r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b|\bCALL\s+(dbms|apoc)\.",
+    re.IGNORECASE,
+)
+
+
+def abstract_question(query: str) -> Tuple[str, Dict[str, str], List[Tuple[str, Tuple[str, ...]]]]:
+    """질문 속 종목명/종목코드/날짜를 자리표시자로 바꿔 질문 형태, Cypher 파라미터, 엔티티별 (값, 파라미터명) 목록을 반환
+
+    예: "삼성전자의 경쟁사는?" → ("{stock_0}의 경쟁사는", {"stock_name_0": "삼성전자", "stock_code_0": "005930"}, ...)
+    """
+    resolver = get_stock_resolver()
+    spans = []
+    stock_ids: Dict[str, int] = {}
+    for start, end, code in resolver.spans(query):
+        spans.append((start, end, f"stock_{stock_ids.setdefault(code, len(stock_ids))}"))
+    date_ids: Dict[str, int] = {}
+    for match in _DATE_PATTERN.finditer(query):
+        spans.append((match.start(), match.end(), f"date_{date_ids.setdefault(match.group(), len(date_ids))}"))
+
+    shape, last = [], 0
+    for start, end, placeholder in sorted(spans):
+        if start < last:
+            continue
+        shape.append(query[last:start] + "{" + placeholder + "}")
+        last = end
+    shape.append(query[last:])
+    shape = " ".join("".join(shape).lower().split()).rstrip("?.! ")
+
+    params: Dict[str, str] = {}
+    entities: List[Tuple[str, Tuple[str, ...]]] = []
+    for code, i in stock_ids.items():
+        stock = resolver.listing_index.find_by_code(code)
+        params[f"stock_name_{i}"] = stock["stock_name"]
+        params[f"stock_code_{i}"] = code
+        entities.append((f"stock_{i}", (f"stock_name_{i}", f"stock_code_{i}")))
+    for date, i in date_ids.items():
+        params[f"date_{i}"] = date
+        entities.append((f"date_{i}", (f"date_{i}",)))
+    return shape, params, entities
+
+
+def to_cypher_template(cypher: str, params: Dict[str, str], entities: List[Tuple[str, Tuple[str, ...]]]) -> Optional[str]:
+    """생성된 Cypher의 엔티티 리터럴을 파라미터로 치환. 모든 엔티티가 치환된 조회 전용 쿼리만 템플릿으로 인정"""
+    if not cypher or _WRITE_CLAUSE.search(cypher):
+        return None
+
+    template = cypher
+    # 긴 리터럴부터 치환 (예: 'SK하이닉스'를 '하이닉스'보다 먼저)
+    for name in sorted(params, key=lambda name: -len(params[name])):
+        pattern = re.compile(r"(['\"])" + re.escape(params[name]) + r"\1")
+        template = pattern.sub(f"${name}", template)
+
+    for _, names in entities:
+        if not any(f"${name}" in template for name in names):
+            return None
+    return template
+
 
 class GraphQAToolInput(BaseModel):
     query: str = Field(
@@ -31,6 +100,7 @@ class GraphQATool(BaseTool):
     args_schema: Type[BaseModel] = GraphQAToolInput
     return_direct: bool = False
     chain: GraphCypherQAChain
+    template_cache: Optional[TTLCache] = None
 
     def __init__(self):
         # Neo4j 그래프 초기화
@@ -61,17 +131,62 @@ class GraphQATool(BaseTool):
         super().__init__(
             graph=graph,
             llm=llm,
-            chain=chain
+            chain=chain,
+            # 질문 형태 → 검증된 Cypher 템플릿
+            template_cache=TTLCache(
+                maxsize=int(os.getenv("CYPHER_TEMPLATE_CACHE_SIZE", "1024")),
+                ttl=float(os.getenv("CYPHER_TEMPLATE_CACHE_TTL", "86400")),
+            ),
         )
 
     # 답변과 cypher 쿼리를 반환
-    def kgqa_chain(self, query: str):
-        output = self.chain.invoke({"query": query}) # 출력
+    async def kgqa_chain(self, query: str):
+        shape, params, entities = abstract_question(query)
+
+        # 자주 들어오는 질문 형태는 LLM 호출 없이 인덱스를 타는 라이브러리 Cypher로 바로 조회
+        intent = match_intent(shape, params)
+        if intent is not None:
+            intent_name, cypher, query_params = intent
+            try:
+                async with get_neo4j_driver().session() as session:
+                    result = await session.run(cypher, query_params)
+                    records = await result.data()
+                if records:
+                    return {
+                        'answer': records,
+                        'cypher': cypher,
+                        'intent': intent_name
+                    }
+            except Neo4jError as e:
+                logger.warning(f"cypher library query '{intent_name}' failed: {e}")
+
+        # 같은 형태의 질문에 대해 검증된 템플릿이 있으면 Cypher 생성 LLM 호출 없이 바로 실행
+        template = self.template_cache.get(shape)
+        if template is not None:
+            try:
+                return {
+                    'answer': await self.answer_with_template(query, template, params),
+                    'cypher': template
+                }
+            except Neo4jError as e:
+                logger.warning(f"cached cypher template failed, regenerating: {e}")
+                self.template_cache.pop(shape)
+
+        output = await self.chain.ainvoke({"query": query}) # 출력
         answer = output.get('result', '') # 답변
 
         cypher = ''
+        context = []
         if 'intermediate_steps' in output and output['intermediate_steps']:
             cypher = output['intermediate_steps'][0].get('query', '')
+            if len(output['intermediate_steps']) > 1:
+                context = output['intermediate_steps'][1].get('context', [])
+
+        # 결과가 있었던 조회 전용 쿼리만 템플릿으로 저장
+        if context:
+            template = to_cypher_template(cypher, params, entities)
+            if template is not None:
+                self.template_cache.set(shape, template)
 
         result = {
             'answer': answer,
@@ -79,6 +194,14 @@ class GraphQATool(BaseTool):
         }
         return result
 
+    async def answer_with_template(self, query: str, template: str, params: Dict[str, str]) -> str:
+        async with get_neo4j_driver().session() as session:
+            result = await session.run(template, params)
+            context = (await result.data())[:self.chain.top_k]
+
+        answer = await self.chain.qa_chain.ainvoke({"question": query, "context": context})
+        return answer if isinstance(answer, str) else answer.get("text", "")
+
     def _run(self, 
              query: str,
              config: RunnableConfig,
@@ -92,7 +215,7 @@ class GraphQATool(BaseTool):
                     run_manager: Optional[AsyncCallbackManagerForToolRun] = None) -> str:
         """메인 비동기 실행 메서드"""
 
-        result = self.kgqa_chain(query)
+        result = await self.kgqa_chain(query)
         
         return result
 
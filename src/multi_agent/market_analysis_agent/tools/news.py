@@ -1,20 +1,16 @@
-import os
 from typing import Type, Optional, ClassVar
 from langchain_core.tools import BaseTool
-from langchain_milvus import Milvus
 from langchain_core.callbacks import (
     AsyncCallbackManagerForToolRun,
     CallbackManagerForToolRun,
 )
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_core.vectorstores import VectorStore
 from langchain_core.runnables import RunnableConfig
 from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
 import json
 import dotenv
 import asyncio
-from langchain_openai import ChatOpenAI
+from ...web_search import WebSearch, get_web_search
 
 
 class SearchNewsInput(BaseModel):
@@ -32,11 +28,8 @@ class SearchNewsTool(BaseTool):
     args_schema: Type[BaseModel] = SearchNewsInput
     return_direct: bool = False
 
-    llm: ClassVar[ChatOpenAI] = ChatOpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        model="perplexity/sonar",
-        api_key=os.getenv("OPENROUTER_API_KEY")
-    )
+    # 같은 질의는 캐시 결과를 쓰고, 동시에 들어온 같은 질의는 한 번만 검색
+    web_search: ClassVar[WebSearch] = get_web_search()
 
     def _run(
         self,
@@ -52,6 +45,4 @@ class SearchNewsTool(BaseTool):
         config: RunnableConfig = None,
         run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
     ):
-        response = await self.llm.ainvoke(query)
-
-        return response.content
+        return await self.web_search.search(query)
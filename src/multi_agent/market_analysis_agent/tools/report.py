@@ -2,7 +2,7 @@ import os
 import asyncio
 from typing import Type, Optional
 from datetime import datetime, timedelta
-from pymongo import AsyncMongoClient
+from pymongo import ASCENDING, DESCENDING
 from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import (
@@ -11,6 +11,33 @@ from langchain_core.callbacks import (
 )
 from langchain_core.runnables import RunnableConfig
 import dotenv
+from ...mongo import get_mongo_collection
+from ...listing import get_listing_index
+from .report_index import get_report_index
+
+
+# 리포트 조회 범위와 프롬프트에 들어가는 분량 제한
+REPORT_SEARCH_DAYS = int(os.getenv("REPORT_SEARCH_DAYS", "90"))
+REPORT_SEARCH_LIMIT = int(os.getenv("REPORT_SEARCH_LIMIT", "10"))
+REPORT_SUMMARY_MAX_CHARS = int(os.getenv("REPORT_SUMMARY_MAX_CHARS", "1000"))
+REPORT_PASSAGE_LIMIT = int(os.getenv("REPORT_PASSAGE_LIMIT", "8"))
+REPORT_PROJECTION = {
+    "_id": False,
+    "company": True,
+    "date": True,
+    "goal_price": True,
+    "opinion": True,
+    "provider": True,
+    "summary": True,
+}
+
+
+async def ensure_report_indexes():
+    """리포트 조회용 복합 인덱스 생성 (이미 있으면 무시)"""
+    collection = get_mongo_collection("report")
+    # 종목명 검색(SearchReportTool)과 종목코드 검색(감정 분석) 모두 최신순 날짜 범위 조회
+    await collection.create_index([("company", ASCENDING), ("date", DESCENDING)], name="company_date")
+    await collection.create_index([("code", ASCENDING), ("date", DESCENDING)], name="code_date")
 
 
 class SearchReportInput(BaseModel):
@@ -18,6 +45,18 @@ class SearchReportInput(BaseModel):
         description='Company name to search for professional investment bank reports (e.g., "삼성전자", "현대차"). '
         "Use this to find expert analysis and recommendations for your target company."
     )
+    days: int = Field(
+        default=REPORT_SEARCH_DAYS,
+        ge=1,
+        le=730,
+        description="Search reports published within this many days"
+    )
+    limit: int = Field(
+        default=REPORT_SEARCH_LIMIT,
+        ge=1,
+        le=30,
+        description="Maximum number of most recent reports to return"
+    )
 
 
 class SearchReportTool(BaseTool):
@@ -37,45 +76,124 @@ class SearchReportTool(BaseTool):
     return_direct: bool = False
 
     mongo_collection: object
-    three_ago: object = datetime.today() - timedelta(3)
 
     def __init__(self):
-        mongo_client = AsyncMongoClient(os.environ["MONGO_URI"])
-        mongo_db = mongo_client["stockelper"]
-        mongo_collection = mongo_db["report"]
-        super().__init__(mongo_collection=mongo_collection)
+        super().__init__(mongo_collection=get_mongo_collection("report"))
 
     def _run(
         self,
         company_name: str,
+        days: int = REPORT_SEARCH_DAYS,
+        limit: int = REPORT_SEARCH_LIMIT,
         config: RunnableConfig = None,
         run_manager: Optional[CallbackManagerForToolRun] = None,
     ):
-        return asyncio.run(self._arun(company_name, config, run_manager))
+        return asyncio.run(self._arun(company_name, days, limit, config, run_manager))
 
     async def _arun(
         self,
         company_name: str,
+        days: int = REPORT_SEARCH_DAYS,
+        limit: int = REPORT_SEARCH_LIMIT,
         config: RunnableConfig = None,
         run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
     ):
-        documents = []
-        async for doc in self.mongo_collection.find({"company": company_name}).sort("date", -1):
-            documents.append(doc)
+        # 리포트 날짜는 "YYYY/MM/DD" 문자열로 저장되어 있음
+        start_date = (datetime.now() - timedelta(days=days)).strftime("%Y/%m/%d")
+        cursor = (
+            self.mongo_collection.find(
+                {"company": company_name, "date": {"$gte": start_date}},
+                REPORT_PROJECTION,
+            )
+            .sort("date", -1)
+            .limit(limit)
+        )
 
         observation = []
-
-        for i, doc in enumerate(documents):
+        async for doc in cursor:
+            summary = doc.get('summary') or ''
             observation.append(
                 {
-                    "company": doc['company'],
-                    "date": doc['date'],
-                    'goal_price': doc['goal_price'],
-                    'opinion': doc['opinion'],
-                    'provider': doc['provider'],
-                    'summary': doc['summary'],
+                    "company": doc.get('company'),
+                    "date": doc.get('date'),
+                    'goal_price': doc.get('goal_price'),
+                    'opinion': doc.get('opinion'),
+                    'provider': doc.get('provider'),
+                    'summary': summary[:REPORT_SUMMARY_MAX_CHARS],
                 }
             )
 
         return observation
 
+
+class SearchReportPassagesInput(BaseModel):
+    query: str = Field(
+        description='What you want to find in reports and news (e.g., "HBM 수요 전망", "2분기 실적 부진 원인")'
+    )
+    company_name: Optional[str] = Field(
+        default=None,
+        description="Company name or 6-digit stock code to restrict the search to. Leave empty to search all companies."
+    )
+    days: int = Field(
+        default=REPORT_SEARCH_DAYS,
+        ge=1,
+        le=730,
+        description="Search reports and news published within this many days"
+    )
+    limit: int = Field(
+        default=REPORT_PASSAGE_LIMIT,
+        ge=1,
+        le=30,
+        description="Maximum number of passages to return"
+    )
+
+
+class SearchReportPassagesTool(BaseTool):
+    name: str = "search_report_passages"
+    description: str = (
+        "Semantic search over investment bank report and news passages. "
+        "Returns only the passages most relevant to the query (optionally for one company), "
+        "with company, date, provider and similarity score. "
+        "Use this instead of reading whole reports when you need evidence for a specific topic."
+    )
+    args_schema: Type[BaseModel] = SearchReportPassagesInput
+    return_direct: bool = False
+
+    def _run(
+        self,
+        query: str,
+        company_name: Optional[str] = None,
+        days: int = REPORT_SEARCH_DAYS,
+        limit: int = REPORT_PASSAGE_LIMIT,
+        config: RunnableConfig = None,
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ):
+        return asyncio.run(self._arun(query, company_name, days, limit, config, run_manager))
+
+    async def _arun(
+        self,
+        query: str,
+        company_name: Optional[str] = None,
+        days: int = REPORT_SEARCH_DAYS,
+        limit: int = REPORT_PASSAGE_LIMIT,
+        config: RunnableConfig = None,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ):
+        stock_code = None
+        if company_name:
+            # 종목코드로 거르면 리포트/뉴스의 종목명 표기 차이와 무관하게 찾을 수 있음
+            company_name = company_name.strip()
+            stock = get_listing_index().find_by_code(company_name) or get_listing_index().find_by_name(company_name)
+            stock_code = stock["stock_code"] if stock is not None else None
+
+        start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        # 최초 호출 시 임베딩 모델 로딩/인덱스 열기까지 포함해 동기 호출 전체를 스레드에서 실행
+        return await asyncio.to_thread(
+            lambda: get_report_index().search(
+                query,
+                stock_code=stock_code,
+                company=company_name,
+                start_date=start_date,
+                limit=limit,
+            )
+        )
@@ -0,0 +1,223 @@
+import os
+import re
+import hashlib
+import threading
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+import lancedb
+import pyarrow as pa
+from langchain_huggingface import HuggingFaceEmbeddings
+from ...cache import TTLCache
+
+
+REPORT_INDEX_PATH = os.getenv("REPORT_INDEX_PATH", os.path.join(".cache", "lancedb"))
+REPORT_INDEX_TABLE = "report_passages"
+# 다국어(한국어 포함) 검색용 임베딩 모델
+REPORT_EMBEDDING_MODEL = os.getenv("REPORT_EMBEDDING_MODEL", "BAAI/bge-m3")
+REPORT_EMBEDDING_BATCH_SIZE = int(os.getenv("REPORT_EMBEDDING_BATCH_SIZE", "32"))
+REPORT_PASSAGE_CHARS = int(os.getenv("REPORT_PASSAGE_CHARS", "400"))
+# 행 수가 적을 때는 전수 검색이 정확하고 충분히 빠르므로, 이 이상일 때만 ANN(IVF_PQ) 인덱스 생성
+REPORT_INDEX_ANN_MIN_ROWS = int(os.getenv("REPORT_INDEX_ANN_MIN_ROWS", "20000"))
+# 배치 작업이 추가한 행을 서버가 읽는 주기
+REPORT_INDEX_REFRESH_SECONDS = int(os.getenv("REPORT_INDEX_REFRESH_SECONDS", "60"))
+
+RESULT_COLUMNS = ["source", "stock_code", "company", "date", "title", "provider", "text"]
+_SENTENCE_END = re.compile(r"(?<=[.!?。다])\s+|\n+")
+_IN_CHUNK = 500
+
+
+def split_passages(text: str, max_chars: int = REPORT_PASSAGE_CHARS) -> List[str]:
+    """문장 경계 기준으로 max_chars 이하의 구절로 나눔 (한 문장이 더 길면 잘라서 나눔)"""
+    passages, current = [], ""
+    for sentence in _SENTENCE_END.split(text or ""):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            if current:
+                passages.append(current)
+                current = ""
+            passages.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            passages.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        passages.append(current)
+    return passages
+
+
+def to_passages(source: str, doc_id: str, document: Dict[str, str], text: str) -> List[Dict[str, object]]:
+    """문서 하나를 구절 행 목록으로 변환
+
+    document에는 stock_code, company, date, title, provider를 담습니다. 종목코드는 6자리, 날짜는 "YYYY-MM-DD"로 맞춥니다.
+    """
+    base = {
+        "source": source,
+        "doc_id": doc_id,
+        "stock_code": str(document.get("stock_code") or "").removeprefix("A"),
+        "company": document.get("company") or "",
+        "date": str(document.get("date") or "").replace("/", "-")[:10],
+        "title": document.get("title") or "",
+        "provider": document.get("provider") or "",
+    }
+    return [
+        {
+            **base,
+            "id": hashlib.sha1(f"{source}:{doc_id}:{i}".encode("utf-8")).hexdigest(),
+            "text": passage,
+            "content_hash": hashlib.sha1(passage.encode("utf-8")).hexdigest(),
+        }
+        for i, passage in enumerate(split_passages(text))
+    ]
+
+
+def _quote(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _in_filter(column: str, values: Iterable[str]) -> str:
+    return f"{column} IN ({', '.join(_quote(value) for value in values)})"
+
+
+class ReportVectorIndex:
+    """리포트/뉴스 구절 임베딩을 로컬 디스크(LanceDB)에 보관하고 질의와 종목으로 검색하는 임베디드 벡터 인덱스"""
+
+    def __init__(self, path: str = REPORT_INDEX_PATH, model_name: str = REPORT_EMBEDDING_MODEL):
+        self.db = lancedb.connect(path, read_consistency_interval=timedelta(seconds=REPORT_INDEX_REFRESH_SECONDS))
+        self.embeddings = HuggingFaceEmbeddings(
+            model_name=model_name,
+            encode_kwargs={"batch_size": REPORT_EMBEDDING_BATCH_SIZE, "normalize_embeddings": True},
+        )
+        # 같은 질의를 반복해서 임베딩하지 않도록 캐시
+        self.query_cache = TTLCache(maxsize=1024, ttl=3600)
+        self._table = None
+
+    @property
+    def table(self):
+        if self._table is None and REPORT_INDEX_TABLE in self.db.table_names():
+            self._table = self.db.open_table(REPORT_INDEX_TABLE)
+        return self._table
+
+    def _existing(self, column: str, values: List[str], columns: List[str]) -> List[dict]:
+        if self.table is None:
+            return []
+        rows = []
+        for start in range(0, len(values), _IN_CHUNK):
+            chunk = values[start:start + _IN_CHUNK]
+            rows += (
+                self.table.search()
+                .where(_in_filter(column, chunk))
+                .select(columns)
+                .limit(None)
+                .to_list()
+            )
+        return rows
+
+    def upsert(self, passages: List[Dict[str, object]]) -> int:
+        """새로 들어오거나 내용이 바뀐 문서의 구절만 임베딩하여 반영하고 추가한 행 수를 반환
+
+        문서의 구절 id/내용 집합이 저장된 것과 다르면 (구절이 바뀌거나 늘거나 줄어든 경우) 기존 구절을 모두 지우고 다시 넣으며,
+        같은 내용의 구절(여러 종목을 언급한 뉴스 등)은 저장된 임베딩을 재사용합니다.
+        """
+        passages = list({passage["id"]: passage for passage in passages}.values())
+        documents: Dict[str, Dict[str, str]] = {}
+        for passage in passages:
+            documents.setdefault(passage["doc_id"], {})[passage["id"]] = passage["content_hash"]
+        indexed: Dict[str, Dict[str, str]] = {}
+        for row in self._existing("doc_id", list(documents), ["doc_id", "id", "content_hash"]):
+            indexed.setdefault(row["doc_id"], {})[row["id"]] = row["content_hash"]
+
+        changed_docs = {doc_id for doc_id, hashes in documents.items() if indexed.get(doc_id) != hashes}
+        passages = [passage for passage in passages if passage["doc_id"] in changed_docs]
+        if not passages:
+            return 0
+
+        hashes = list({passage["content_hash"] for passage in passages})
+        vectors = {row["content_hash"]: row["vector"] for row in self._existing("content_hash", hashes, ["content_hash", "vector"])}
+        missing = [h for h in hashes if h not in vectors]
+        if missing:
+            texts = {passage["content_hash"]: passage["text"] for passage in passages}
+            vectors.update(zip(missing, self.embeddings.embed_documents([texts[h] for h in missing])))
+
+        rows = [{**passage, "vector": [float(x) for x in vectors[passage["content_hash"]]]} for passage in passages]
+        replaced_docs = [doc_id for doc_id in changed_docs if doc_id in indexed]
+
+        if self.table is None:
+            dimension = len(rows[0]["vector"])
+            schema = pa.schema(
+                [pa.field(name, pa.string()) for name in ["id", "source", "doc_id", "stock_code", "company", "date", "title", "provider", "text", "content_hash"]]
+                + [pa.field("vector", pa.list_(pa.float32(), dimension))]
+            )
+            self._table = self.db.create_table(REPORT_INDEX_TABLE, schema=schema)
+        for start in range(0, len(replaced_docs), _IN_CHUNK):
+            self.table.delete(_in_filter("doc_id", replaced_docs[start:start + _IN_CHUNK]))
+        self.table.add(rows)
+        return len(rows)
+
+    def create_indexes(self):
+        """종목코드/문서 id 스칼라 인덱스와 (행 수가 충분하면) 벡터 ANN 인덱스를 다시 생성"""
+        if self.table is None:
+            return
+        self.table.create_scalar_index("stock_code", replace=True)
+        # upsert가 문서 단위로 기존 구절을 조회/삭제
+        self.table.create_scalar_index("doc_id", replace=True)
+        if self.table.count_rows() >= REPORT_INDEX_ANN_MIN_ROWS:
+            self.table.create_index(metric="cosine", vector_column_name="vector", replace=True)
+
+    def embed_query(self, query: str) -> List[float]:
+        key = query.strip()
+        vector = self.query_cache.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(key)
+            self.query_cache.set(key, vector)
+        return vector
+
+    def search(
+        self,
+        query: str,
+        stock_code: Optional[str] = None,
+        company: Optional[str] = None,
+        start_date: Optional[str] = None,
+        sources: Optional[List[str]] = None,
+        limit: int = 8,
+    ) -> List[Dict[str, object]]:
+        """질의와 가장 가까운 구절 목록 (종목/기간/출처로 먼저 거른 뒤 검색)"""
+        if self.table is None:
+            return []
+
+        filters = []
+        if stock_code:
+            filters.append(f"stock_code = {_quote(stock_code.removeprefix('A'))}")
+        elif company:
+            filters.append(f"company = {_quote(company)}")
+        if start_date:
+            filters.append(f"date >= {_quote(start_date)}")
+        if sources:
+            filters.append(_in_filter("source", sources))
+
+        builder = self.table.search(self.embed_query(query)).metric("cosine")
+        if filters:
+            builder = builder.where(" AND ".join(filters), prefilter=True)
+        # ANN 인덱스가 있을 때 재현율을 높이기 위해 후보를 넓게 보고 원본 벡터로 다시 정렬
+        results = builder.nprobes(20).refine_factor(5).select(RESULT_COLUMNS).limit(limit).to_list()
+        return [
+            {**{column: row[column] for column in RESULT_COLUMNS}, "score": round(1 - float(row["_distance"]), 4)}
+            for row in results
+        ]
+
+
+_report_index: Optional[ReportVectorIndex] = None
+_report_index_lock = threading.Lock()
+
+
+def get_report_index() -> ReportVectorIndex:
+    """최초 호출 시 한 번만 임베딩 모델과 인덱스를 여는 공용 벡터 인덱스"""
+    global _report_index
+    if _report_index is None:
+        with _report_index_lock:
+            if _report_index is None:
+                _report_index = ReportVectorIndex()
+    return _report_index
@@ -1,9 +1,9 @@
 import os
 import praw
 import asyncio
+import logging
 from datetime import datetime, timedelta
 from typing import Type, Optional, Dict, List
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.tools import BaseTool
@@ -13,31 +13,34 @@ from langchain_core.callbacks import (
 )
 from langchain_core.runnables import RunnableConfig
 from pydantic import BaseModel, Field
-from pymongo import AsyncMongoClient
 import json
+import hashlib
 import dotenv
+from pymongo import ReplaceOne
+from ...mongo import get_mongo_collection
+from .sentiment_model import get_sentiment_classifier
+from .sentiment_series import SentimentSeriesStore, to_daily_series
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# 감성 점수 계산기: local (로컬 CPU 분류기, 기본) 또는 llm. LLM은 기본적으로 추세 해석에만 사용
+SENTIMENT_SCORER = os.getenv("SENTIMENT_SCORER", "local")
+# LLM 채점 시 한 번의 호출에 넣는 입력 토큰 예산/텍스트 수와 동시 호출 수
+SENTIMENT_CHUNK_TOKENS = int(os.getenv("SENTIMENT_CHUNK_TOKENS", "3000"))
+SENTIMENT_CHUNK_MAX_TEXTS = int(os.getenv("SENTIMENT_CHUNK_MAX_TEXTS", "20"))
+SENTIMENT_MAX_TEXT_CHARS = int(os.getenv("SENTIMENT_MAX_TEXT_CHARS", "2000"))
+SENTIMENT_CONCURRENCY = int(os.getenv("SENTIMENT_CONCURRENCY", "4"))
+SENTIMENT_WINDOW_DAYS = int(os.getenv("SENTIMENT_WINDOW_DAYS", "30"))
 
 
 SENTIMENT_SYSTEM_TEMPLATE = "금융 텍스트의 감성을 분석하는 전문가입니다."
-SENTIMENT_USER_TEMPLATE = """여러 텍스트의 감성 분석을 진행합니다. 각 텍스트의 긍정/부정 점수를 0과 1 사이의 숫자로만 출력해주세요. 
-
-입력 텍스트:
-{formatted_texts}
-
-다음 형식으로만 출력하세요:
-[
-    {{
-        "date": "2025/01/01",
-        "positive": 0.8,
-        "negative": 0.2,
-    }},
-    {{
-        "date": "2025/01/02",
-        "positive": 0.6,
-        "negative": 0.4,
-    }},
-    ...
-]"""
+SENTIMENT_USER_TEMPLATE = """여러 텍스트의 감성 분석을 진행합니다. 각 텍스트의 긍정/부정 점수를 0과 1 사이의 숫자로 매겨주세요.
+입력 텍스트의 번호를 id로 하여 모든 텍스트의 점수를 빠짐없이 출력하세요.
+
+입력 텍스트 ([번호] 날짜: 내용):
+{formatted_texts}"""
 
 TREND_SYSTEM_TEMPLATE = "You are a financial analyst expert."
 TREND_USER_TEMPLATE = """다음 금융 감성 분석 데이터를 분석하여 주요 감성 트렌드와 핵심 포인트를 파악해주세요:
@@ -49,10 +52,40 @@ TREND_USER_TEMPLATE = """다음 금융 감성 분석 데이터를 분석하여 
 3. 향후 전망에 영향을 미칠 수 있는 핵심 요소"""
 
 
+class SentimentScore(BaseModel):
+    id: int = Field(description="The number of the input text")
+    positive: float = Field(description="Positive score between 0 and 1")
+    negative: float = Field(description="Negative score between 0 and 1")
+
+
+class SentimentScoreList(BaseModel):
+    scores: List[SentimentScore] = Field(description="Scores for every input text")
+
+
+def chunk_by_token_budget(token_counts: List[int], budget: int, max_items: int) -> List[List[int]]:
+    """텍스트 인덱스를 토큰 예산과 최대 개수를 넘지 않는 묶음으로 나눔 (예산보다 큰 텍스트는 단독 묶음)"""
+    chunks, current, current_tokens = [], [], 0
+    for i, tokens in enumerate(token_counts):
+        if current and (current_tokens + tokens > budget or len(current) >= max_items):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 class ReportSentimentAnalysisInput(BaseModel):
     ticker_symbol: str = Field(
         description="Stock ticker symbol to analyze. e.g. 005930"
     )
+    days: int = Field(
+        default=SENTIMENT_WINDOW_DAYS,
+        ge=1,
+        le=730,
+        description="Number of recent days of the daily sentiment series to analyze"
+    )
 
 class BaseSentimentAnalysisTool(BaseTool):
     name: str = "base_sentiment_analysis"
@@ -65,29 +98,58 @@ class BaseSentimentAnalysisTool(BaseTool):
             trend_analysis_llm=ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
         )
 
-    async def analyze_sentiments_batch(self, texts: List[Dict]) -> List[Dict]:
-        """한 번의 API 호출로 여러 텍스트의 감성 분석"""
+    async def analyze_sentiments_batch(self, texts: List[Dict]) -> List[Optional[Dict]]:
+        """여러 텍스트의 감성을 토큰 예산 단위로 나누어 동시에 분석. 입력 순서와 같은 순서로 {"positive", "negative"} 목록 반환 (실패한 항목은 None)"""
         if not texts:
             return []
-        
-        formatted_texts = "\n\n".join([
-            f"{text['date']}: {text['summary']}"
-            for i, text in enumerate(texts)
-        ])
 
-        response = await self.sentiment_analysis_llm.ainvoke(
-            [
-                SystemMessage(content=SENTIMENT_SYSTEM_TEMPLATE),
-                HumanMessage(content=SENTIMENT_USER_TEMPLATE.format(formatted_texts=formatted_texts))
-            ]
-        )
+        lines = [
+            f"{text['date']}: {(text['summary'] or '')[:SENTIMENT_MAX_TEXT_CHARS]}"
+            for text in texts
+        ]
+        token_counts = [self.sentiment_analysis_llm.get_num_tokens(line) for line in lines]
+        chunks = chunk_by_token_budget(token_counts, SENTIMENT_CHUNK_TOKENS, SENTIMENT_CHUNK_MAX_TEXTS)
 
-        try:
-            results = response.content.strip()
-        except Exception as e: 
-            print(e)
+        llm = self.sentiment_analysis_llm.with_structured_output(SentimentScoreList)
+        semaphore = asyncio.Semaphore(SENTIMENT_CONCURRENCY)
+        scores = [None] * len(texts)
+
+        async def score_chunk(chunk: List[int]):
+            # 묶음 안에서 0부터 번호를 매기고, 결과는 원래 인덱스로 되돌림
+            formatted_texts = "\n\n".join(f"[{local_id}] {lines[i]}" for local_id, i in enumerate(chunk))
+            async with semaphore:
+                try:
+                    response = await llm.ainvoke(
+                        [
+                            SystemMessage(content=SENTIMENT_SYSTEM_TEMPLATE),
+                            HumanMessage(content=SENTIMENT_USER_TEMPLATE.format(formatted_texts=formatted_texts))
+                        ]
+                    )
+                except Exception:
+                    logger.warning(f"sentiment scoring failed for a chunk of {len(chunk)} texts", exc_info=True)
+                    return
+            for item in response.scores:
+                if 0 <= item.id < len(chunk):
+                    scores[chunk[item.id]] = {"positive": item.positive, "negative": item.negative}
+
+        await asyncio.gather(*[score_chunk(chunk) for chunk in chunks])
+        return scores
+
+    async def get_scorer_name(self) -> str:
+        if SENTIMENT_SCORER == "llm":
+            return f"llm:{self.sentiment_analysis_llm.model_name}"
+        classifier = await asyncio.to_thread(get_sentiment_classifier)
+        return classifier.name
+
+    async def score_texts(self, texts: List[Dict]) -> List[Optional[Dict]]:
+        """텍스트 목록의 {"positive", "negative"} 점수를 입력 순서대로 반환 (실패한 항목은 None)"""
+        if not texts:
             return []
-        return results
+        if SENTIMENT_SCORER == "llm":
+            return await self.analyze_sentiments_batch(texts)
+        # CPU 추론은 이벤트 루프를 막지 않도록 스레드에서 실행
+        classifier = await asyncio.to_thread(get_sentiment_classifier)
+        return await asyncio.to_thread(classifier.score, [text['summary'] for text in texts])
 
     async def analyze_trends(self, results: str) -> str:
         """Analyze sentiment trends and key points."""
@@ -106,44 +168,134 @@ class ReportSentimentAnalysisTool(BaseSentimentAnalysisTool):
     args_schema: Type[BaseModel] = ReportSentimentAnalysisInput  
     return_direct: bool = False
 
+    mongo_collection: object = None
+    score_collection: object = None
+    series_store: SentimentSeriesStore = None
+
+    def __init__(self):
+        super().__init__()
+        self.mongo_collection = get_mongo_collection("report")
+        # 리포트별 감정 점수 저장소 (_id: 리포트 _id, content_hash: 채점한 요약의 해시)
+        self.score_collection = get_mongo_collection("report_sentiment")
+        # 배치 작업이 미리 집계한 종목별 일간 감성 시계열
+        self.series_store = SentimentSeriesStore()
+
     async def get_report_data(self, ticker_symbol: str, days: int = 30) -> List[Dict]:
         """Get report data from MongoDB collection."""
         end_date = datetime.now()
         start_date = (end_date - timedelta(days=days)).strftime("%Y/%m/%d")
         
-        mongo_client = AsyncMongoClient(os.getenv("MONGO_URI"))
-        collection = mongo_client['stockelper']['report']
-        
         data = []
-        async for doc in collection.find(
+        async for doc in self.mongo_collection.find(
             {"$and": [{"date": {"$gte": start_date}}, {"code": f"A{ticker_symbol}"}]},
-            {"_id": False, "date": True, "summary": True}
+            {"_id": True, "code": True, "date": True, "summary": True}
         ):
             data.append(doc)
         
         return data
+
+    async def get_report_scores(self, reports: List[Dict]) -> Dict[object, Dict]:
+        """저장된 점수를 불러오고, 새 리포트(또는 요약이 바뀐 리포트)만 채점하여 저장한 뒤 리포트 _id별 점수 반환"""
+        hashes = {
+            report["_id"]: hashlib.sha256((report.get("summary") or "").encode("utf-8")).hexdigest()
+            for report in reports
+        }
+
+        scorer = await self.get_scorer_name()
+
+        # 같은 요약을 같은 계산기로 채점한 점수만 재사용
+        scores = {}
+        async for doc in self.score_collection.find({"_id": {"$in": list(hashes)}}):
+            if doc.get("content_hash") == hashes[doc["_id"]] and doc.get("scorer") == scorer:
+                scores[doc["_id"]] = doc
+
+        unscored = [report for report in reports if report["_id"] not in scores]
+        if unscored:
+            new_scores = await self.score_texts(unscored)
+            operations = []
+            for report, score in zip(unscored, new_scores):
+                if score is None:
+                    continue
+                doc = {
+                    "_id": report["_id"],
+                    "content_hash": hashes[report["_id"]],
+                    "code": report.get("code"),
+                    "date": report["date"],
+                    "positive": score["positive"],
+                    "negative": score["negative"],
+                    "scorer": scorer,
+                    "scored_at": datetime.now(),
+                }
+                scores[report["_id"]] = doc
+                operations.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+            if operations:
+                await self.score_collection.bulk_write(operations, ordered=False)
+
+        return scores
     
     def _run(
         self,
         ticker_symbol: str,
-        config: RunnableConfig,
+        days: int = SENTIMENT_WINDOW_DAYS,
+        config: RunnableConfig = None,
         run_manager: Optional[CallbackManagerForToolRun] = None,
-    ) -> str:
-        return asyncio.run(self._arun(ticker_symbol, config, run_manager))
+    ) -> dict:
+        return asyncio.run(self._arun(ticker_symbol, days, config, run_manager))
     
     async def _arun(
         self,
         ticker_symbol: str, 
-        config: RunnableConfig,
+        days: int = SENTIMENT_WINDOW_DAYS,
+        config: RunnableConfig = None,
         run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
-    ) -> str:
-        reports = await self.get_report_data(ticker_symbol)
-        reports = sorted(reports, key=lambda x: x['date'])
-        results = await self.analyze_sentiments_batch(reports)
-        
+    ) -> dict:
+        # 데이터가 없거나 실패한 경우에도 같은 형태로 반환
+        series = await self.get_daily_series(ticker_symbol, days)
+        if series is None:
+            return {"sentiments": [], "trend_analysis": "리포트 감정 분석에 실패했습니다."}
+        if series.empty:
+            return {"sentiments": [], "trend_analysis": "기간 내 분석할 리포트가 없습니다."}
+
+        series = series.astype({"positive": float, "negative": float, "net": float, "net_std": float, "count": int})
+        output = series.assign(date=series["date"].dt.strftime("%Y-%m-%d")).round(4).to_dict(orient="records")
+        return {
+            "sentiments": output,
+            "trend_analysis": await self.analyze_trends(json.dumps(output, ensure_ascii=False)),
+        }
+
+    async def get_daily_series(self, ticker_symbol: str, days: int) -> Optional[pd.DataFrame]:
+        """최근 days일 일간 감성 시계열. 미리 집계된 시계열에 저장소 생성 이후의 리포트만 실시간으로 채점해 합침"""
         try:
-            output = json.loads(results)
-        except Exception as e:
-            output = {"error": str(e)}
+            stored, built_at = await asyncio.to_thread(self.series_store.series, ticker_symbol, days)
+            live_days = min(days, (datetime.now() - built_at).days + 1)
+        except FileNotFoundError:
+            stored, live_days = None, days
+
+        reports = await self.get_report_data(ticker_symbol, days=live_days)
+        scores = await self.get_report_scores(reports)
+        live = to_daily_series(pd.DataFrame(
+            [
+                {
+                    "stock_code": ticker_symbol,
+                    "date": report["date"],
+                    "source": "report",
+                    "positive": scores[report["_id"]]["positive"],
+                    "negative": scores[report["_id"]]["negative"],
+                }
+                for report in reports
+                if report["_id"] in scores
+            ],
+            columns=["stock_code", "date", "source", "positive", "negative"],
+        )).reset_index(level="stock_code", drop=True).reset_index()
+        if reports and live.empty:
+            return None
 
-        return output
+        if stored is not None:
+            # 실시간으로 다시 집계한 날짜의 리포트 행은 실시간 결과로 대체
+            live_start = pd.Timestamp((datetime.now() - timedelta(days=live_days)).date())
+            stored = stored[~((stored["source"] == "report") & (stored["date"] >= live_start))]
+            # 빈 프레임은 합치지 않음 (빈 쪽 dtype 때문에 date가 datetime이 아니게 되는 것 방지)
+            frames = [frame for frame in (stored, live) if not frame.empty]
+            if frames:
+                live = pd.concat(frames, ignore_index=True)
+        return live.sort_values(["date", "source"]).reset_index(drop=True)
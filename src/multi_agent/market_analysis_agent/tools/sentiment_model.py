@@ -0,0 +1,105 @@
+import os
+import logging
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+logger = logging.getLogger(__name__)
+
+
+# 한국어 금융 문장 감성 분류 모델 (negative / neutral / positive)
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "snunlp/KR-FinBert-SC")
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+SENTIMENT_MAX_LENGTH = int(os.getenv("SENTIMENT_MAX_LENGTH", "256"))
+# 추론 백엔드: torch (기본), quantized (int8 동적 양자화), onnx (optimum[onnxruntime] 필요)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+
+
+class LocalSentimentClassifier:
+    """CPU에서 배치로 추론하는 로컬 금융 텍스트 감성 분류기"""
+
+    def __init__(
+        self,
+        model_name: str = SENTIMENT_MODEL,
+        backend: str = SENTIMENT_BACKEND,
+        batch_size: int = SENTIMENT_BATCH_SIZE,
+        max_length: int = SENTIMENT_MAX_LENGTH,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.backend, self.model = self._load_model(model_name, backend)
+
+        labels = {int(i): label.lower() for i, label in self.model.config.id2label.items()}
+        self.positive_index = next(i for i, label in labels.items() if label.startswith("pos"))
+        self.negative_index = next(i for i, label in labels.items() if label.startswith("neg"))
+
+    @staticmethod
+    def _load_model(model_name: str, backend: str):
+        if backend == "onnx":
+            try:
+                from optimum.onnxruntime import ORTModelForSequenceClassification
+                return "onnx", ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+            except ImportError:
+                logger.warning("optimum[onnxruntime] is not installed, falling back to torch backend")
+                backend = "torch"
+
+        import torch
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model.eval()
+        if backend == "quantized":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return backend, model
+
+    @property
+    def name(self) -> str:
+        """저장된 점수가 어떤 분류기로 계산되었는지 구분하기 위한 이름"""
+        return f"{self.model_name}:{self.backend}"
+
+    def _logits(self, texts: List[str]) -> np.ndarray:
+        inputs = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="pt",
+        )
+        if self.backend == "onnx":
+            return self.model(**inputs).logits.detach().numpy()
+
+        import torch
+        with torch.inference_mode():
+            return self.model(**inputs).logits.numpy()
+
+    def score(self, texts: List[str]) -> List[Dict[str, float]]:
+        """텍스트 목록의 {"positive", "negative"} 확률을 입력 순서대로 반환"""
+        # 길이가 비슷한 텍스트끼리 묶어 패딩 낭비를 줄임
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        probabilities = np.zeros((len(texts), 2))
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            logits = self._logits([texts[i] or "" for i in batch])
+            exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+            softmax = exp / exp.sum(axis=1, keepdims=True)
+            probabilities[batch] = softmax[:, [self.positive_index, self.negative_index]]
+
+        return [
+            {"positive": round(float(positive), 4), "negative": round(float(negative), 4)}
+            for positive, negative in probabilities
+        ]
+
+
+_classifier: Optional[LocalSentimentClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_sentiment_classifier() -> LocalSentimentClassifier:
+    """최초 호출 시 한 번만 모델을 로딩하는 공용 분류기"""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = LocalSentimentClassifier()
+    return _classifier
@@ -0,0 +1,102 @@
+import os
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+SENTIMENT_SERIES_PATH = os.getenv("SENTIMENT_SERIES_PATH", os.path.join(".cache", "sentiment_daily.parquet"))
+SERIES_COLUMNS = ["positive", "negative", "net", "net_std", "count"]
+SERIES_DTYPES = {"positive": "float32", "negative": "float32", "net": "float32", "net_std": "float32", "count": "int32"}
+
+
+def empty_series_columns() -> dict:
+    """빈 시계열도 값이 있을 때와 같은 dtype을 갖도록 하는 빈 컬럼들 (합칠 때 date가 object가 되지 않도록)"""
+    return {column: np.array([], dtype=dtype) for column, dtype in SERIES_DTYPES.items()}
+
+
+def to_daily_series(scores: pd.DataFrame) -> pd.DataFrame:
+    """(stock_code, date, source, positive, negative) 점수 목록을 종목/출처/날짜별 일간 집계로 변환
+
+    net은 긍정-부정 점수, net_std는 같은 날 점수들의 표준편차(분산 정도)입니다.
+    """
+    if scores.empty:
+        index = pd.MultiIndex.from_arrays(
+            [np.array([], dtype=object), np.array([], dtype=object), pd.DatetimeIndex([])],
+            names=["stock_code", "source", "date"],
+        )
+        return pd.DataFrame(empty_series_columns(), index=index)
+
+    scores = pd.DataFrame({
+        # 리포트 종목코드는 "A005930" 형식
+        "stock_code": scores["stock_code"].astype(str).str.removeprefix("A"),
+        "source": scores["source"].astype(str),
+        "date": pd.to_datetime(scores["date"].astype(str).str.replace("/", "-").str[:10], errors="coerce"),
+        "positive": scores["positive"].astype(float),
+        "negative": scores["negative"].astype(float),
+    }).dropna(subset=["date"])
+    scores["net"] = scores["positive"] - scores["negative"]
+    scores["net_sq"] = scores["net"] ** 2
+
+    daily = scores.groupby(["stock_code", "source", "date"]).agg(
+        positive=("positive", "mean"),
+        negative=("negative", "mean"),
+        net=("net", "mean"),
+        net_sq=("net_sq", "mean"),
+        count=("net", "size"),
+    )
+    daily["net_std"] = (daily.pop("net_sq") - daily["net"] ** 2).clip(lower=0) ** 0.5
+    return daily[SERIES_COLUMNS].astype(SERIES_DTYPES).sort_index()
+
+
+class SentimentSeriesStore:
+    """종목별 일간 감성 시계열을 (stock_code, source, date) 인덱스의 parquet 파일로 보관"""
+
+    def __init__(self, path: str = SENTIMENT_SERIES_PATH):
+        self.path = path
+        self._table: Optional[pd.DataFrame] = None
+        self._mtime: Optional[float] = None
+
+    def build(self, scores: pd.DataFrame) -> pd.DataFrame:
+        """점수 목록을 일간 시계열로 집계하여 저장"""
+        table = to_daily_series(scores)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        table.to_parquet(tmp_path)
+        os.replace(tmp_path, self.path)
+
+        self._table = table
+        self._mtime = os.path.getmtime(self.path)
+        return table
+
+    def load(self) -> pd.DataFrame:
+        """저장된 시계열을 메모리에 적재 (파일이 갱신된 경우에만 다시 읽음)"""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"감성 시계열 저장소가 없습니다: {self.path}")
+
+        mtime = os.path.getmtime(self.path)
+        if self._table is None or self._mtime != mtime:
+            self._table = pd.read_parquet(self.path)
+            self._mtime = mtime
+        return self._table
+
+    @property
+    def built_at(self) -> datetime:
+        self.load()
+        return datetime.fromtimestamp(self._mtime)
+
+    def series(self, stock_code: str, days: int = 30) -> Tuple[pd.DataFrame, datetime]:
+        """종목의 최근 days일 일간 시계열 (date, source, positive, negative, net, net_std, count)과 저장소 생성 시각"""
+        table = self.load()
+        start = pd.Timestamp((datetime.now() - timedelta(days=days)).date())
+        if stock_code in table.index.get_level_values("stock_code"):
+            frame = table.xs(stock_code, level="stock_code").reset_index()
+            frame = frame[frame["date"] >= start]
+        else:
+            frame = pd.DataFrame({
+                "source": np.array([], dtype=object),
+                "date": pd.DatetimeIndex([]),
+                **empty_series_columns(),
+            })
+        return frame, self.built_at
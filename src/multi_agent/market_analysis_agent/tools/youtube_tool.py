@@ -1,19 +1,144 @@
 import asyncio
 import os
+import re
 import json
+import math
+from collections import Counter
 from dotenv import load_dotenv
 from pprint import pprint
 from langchain_core.tools import BaseTool
-from typing import Type, Optional, Dict, Any
+from typing import Type, Optional, Dict, Any, List
 from pydantic import BaseModel, Field, PrivateAttr
 from youtube_transcript_api import YouTubeTranscriptApi
 from urllib.parse import urlparse, parse_qs
+import httplib2
 from googleapiclient.discovery import build
 from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain_core.runnables import RunnableConfig
 from datetime import datetime
 
 
+YOUTUBE_TRANSCRIPT_CACHE_DIR = os.getenv("YOUTUBE_TRANSCRIPT_CACHE_DIR", os.path.join(".cache", "youtube"))
+YOUTUBE_TRANSCRIPT_CONCURRENCY = int(os.getenv("YOUTUBE_TRANSCRIPT_CONCURRENCY", "4"))
+# 자막 전체를 구간으로 나눈 뒤 검색어와 관련도가 높은 구간만 글자 수 예산 안에서 반환
+YOUTUBE_EXCERPT_CHUNK_CHARS = int(os.getenv("YOUTUBE_EXCERPT_CHUNK_CHARS", "250"))
+YOUTUBE_EXCERPT_BUDGET_CHARS = int(os.getenv("YOUTUBE_EXCERPT_BUDGET_CHARS", "1000"))
+
+_WORD = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """영문/숫자는 단어 단위, 한글은 조사/어미 변화에 강하도록 글자 bigram 단위로 분리"""
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if word[0] <= "z" or len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def chunk_transcript(transcript: List[dict], chunk_chars: int = YOUTUBE_EXCERPT_CHUNK_CHARS) -> List[dict]:
+    """자막 조각을 이어 붙여 약 chunk_chars 글자 단위 구간으로 묶음 ({"start": 초, "text": 내용})"""
+    chunks, texts, start, length = [], [], None, 0
+    for item in transcript:
+        text = item.get('text', '').replace("\n", " ").strip()
+        if not text:
+            continue
+        if start is None:
+            start = item.get('start', 0)
+        texts.append(text)
+        length += len(text) + 1
+        if length >= chunk_chars:
+            chunks.append({"start": start, "text": " ".join(texts)})
+            texts, start, length = [], None, 0
+    if texts:
+        chunks.append({"start": start, "text": " ".join(texts)})
+    return chunks
+
+
+def bm25_scores(query: str, documents: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    doc_tokens = [Counter(tokenize(document)) for document in documents]
+    lengths = [sum(tokens.values()) for tokens in doc_tokens]
+    avg_length = sum(lengths) / len(lengths) if lengths else 0
+    query_tokens = set(tokenize(query))
+    document_frequency = {token: sum(1 for tokens in doc_tokens if token in tokens) for token in query_tokens}
+
+    scores = []
+    for tokens, length in zip(doc_tokens, lengths):
+        score = 0.0
+        for token in query_tokens:
+            tf = tokens.get(token, 0)
+            if not tf:
+                continue
+            df = document_frequency[token]
+            idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / (avg_length or 1)))
+        scores.append(score)
+    return scores
+
+
+def select_excerpts(query: str, transcript: List[dict], budget_chars: int = YOUTUBE_EXCERPT_BUDGET_CHARS) -> str:
+    """검색어와 관련도가 높은 구간을 예산 안에서 골라 시간 순서로 반환 (관련 구간이 없으면 앞부분부터)"""
+    chunks = chunk_transcript(transcript)
+    if not chunks:
+        return ""
+
+    scores = bm25_scores(query, [chunk["text"] for chunk in chunks])
+    ranked = any(scores)
+    if ranked:
+        order = sorted((i for i in range(len(chunks)) if scores[i] > 0), key=lambda i: (-scores[i], i))
+    else:
+        order = range(len(chunks))
+
+    selected, used = [], 0
+    for i in order:
+        if used + len(chunks[i]["text"]) > budget_chars and selected:
+            # 관련도 순일 때는 예산에 맞는 다음 구간을 찾고, 앞부분부터일 때는 중단
+            if ranked:
+                continue
+            break
+        selected.append(i)
+        used += len(chunks[i]["text"])
+        if used >= budget_chars:
+            break
+
+    excerpts = []
+    for i in sorted(selected):
+        minutes, seconds = divmod(int(chunks[i]["start"]), 60)
+        excerpts.append(f"[{minutes:02d}:{seconds:02d}] {chunks[i]['text'][:budget_chars]}")
+    return "\n...\n".join(excerpts)
+
+
+class TranscriptCache:
+    """동영상 ID 단위 자막 디스크 캐시. 올라간 동영상의 자막은 변하지 않으므로 만료가 없음"""
+
+    def __init__(self, cache_dir: str = YOUTUBE_TRANSCRIPT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, video_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{video_id}.json")
+
+    def get(self, video_id: str) -> Optional[list]:
+        path = self._path(video_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def set(self, video_id: str, transcript: list):
+        # 임시 파일에 쓴 뒤 교체하여 동시 요청 시 깨진 파일이 읽히지 않도록 함
+        path = self._path(video_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(transcript, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
 class YouTubeSearchInput(BaseModel):
     query: str = Field(description="Keywords or topics to search for")
     max_results: int = Field(default=1, description="Maximum number of videos to search for")
@@ -25,16 +150,40 @@ class YouTubeSearchTool(BaseTool):
     args_schema: Type[BaseModel] = YouTubeSearchInput
     return_direct: bool = False
 
-    async def _get_transcript(self, video_id: str) -> str:
-        """YouTube 동영상의 자막을 추출"""
+    youtube: object = None
+    transcript_cache: TranscriptCache = None
+
+    def __init__(self):
+        super().__init__(transcript_cache=TranscriptCache())
+
+    def _get_youtube(self):
+        """YouTube API 클라이언트는 최초 호출 시 한 번만 생성"""
+        if self.youtube is None:
+            self.youtube = build('youtube', 'v3', developerKey=os.environ["YOUTUBE_API_KEY"], cache_discovery=False)
+        return self.youtube
+
+    def _search(self, query: str, max_results: int) -> dict:
+        request = self._get_youtube().search().list(
+            q=query,
+            part='id,snippet',
+            maxResults=max_results,
+            type='video',
+            order='relevance',
+            relevanceLanguage='ko'
+        )
+        # 클라이언트의 기본 http 객체는 스레드 간 공유가 안전하지 않으므로 요청마다 새 http 객체 사용
+        return request.execute(http=httplib2.Http())
+
+    async def _get_transcript(self, video_id: str, query: str) -> str:
+        """YouTube 동영상의 자막에서 검색어와 관련된 구간을 추출"""
         try:
-            transcript = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: YouTubeTranscriptApi.get_transcript(video_id, languages=['ko', 'en'])
-            )
-            # 자막 텍스트를 1000자로 제한
-            full_text = "\n".join([item['text'] for item in transcript])
-            return full_text[:1000] + ("..." if len(full_text) > 1000 else "")
+            transcript = await asyncio.to_thread(self.transcript_cache.get, video_id)
+            if transcript is None:
+                transcript = await asyncio.to_thread(
+                    YouTubeTranscriptApi.get_transcript, video_id, languages=['ko', 'en']
+                )
+                await asyncio.to_thread(self.transcript_cache.set, video_id, transcript)
+            return select_excerpts(query, transcript)
         except Exception as e:
             return f"자막 없음: {str(e)}"
 
@@ -64,36 +213,30 @@ class YouTubeSearchTool(BaseTool):
     ) -> Dict[str, Any]:
         """메인 비동기 실행 메서드"""
         try:
-            # YouTube API 클라이언트 생성과 검색 실행
-            youtube_search = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: build('youtube', 'v3', developerKey=os.environ["YOUTUBE_API_KEY"]).search().list(
-                    q=query,
-                    part='id,snippet',
-                    maxResults=max_results,
-                    type='video',
-                    order='relevance',
-                    relevanceLanguage='ko'
-                ).execute()
-            )
-            
-            # 검색 결과를 순차적으로 처리
+            # 검색 실행 (클라이언트는 재사용)
+            youtube_search = await asyncio.to_thread(self._search, query, max_results)
+
+            items = youtube_search.get('items', [])
+            video_ids = [item['id']['videoId'] for item in items]
+
+            # 자막은 동시 요청 수를 제한하여 병렬로 가져옴
+            semaphore = asyncio.Semaphore(YOUTUBE_TRANSCRIPT_CONCURRENCY)
+
+            async def get_transcript(video_id: str) -> str:
+                async with semaphore:
+                    return await self._get_transcript(video_id, query)
+
+            transcripts = await asyncio.gather(*[get_transcript(video_id) for video_id in video_ids])
+
             results = []
-            all_transcripts = []  # 모든 자막을 저장할 리스트
-            
-            for item in youtube_search.get('items', []):
-                video_id = item['id']['videoId']
-                video_info = {
+            for item, video_id, transcript in zip(items, video_ids, transcripts):
+                results.append({
                     'title': item['snippet']['title'],
                     'channel': item['snippet']['channelTitle'],
                     'description': item['snippet']['description'],
                     'url': f"https://www.youtube.com/watch?v={video_id}",
-                }
-                
-                # 자막 가져오기 (순차적으로 실행)
-                transcript = await self._get_transcript(video_id)
-                video_info['transcript'] = transcript
-                results.append(video_info)
+                    'transcript': transcript,
+                })
 
             return results
             
@@ -0,0 +1,35 @@
+import os
+from typing import Optional
+from pymongo import AsyncMongoClient
+
+
+MONGO_DATABASE = os.getenv("MONGO_DATABASE", "stockelper")
+
+_client: Optional[AsyncMongoClient] = None
+
+
+def get_mongo_client() -> AsyncMongoClient:
+    """애플리케이션 공용 비동기 MongoDB 클라이언트 (커넥션 풀 공유)"""
+    global _client
+    if _client is None:
+        _client = AsyncMongoClient(
+            os.environ["MONGO_URI"],
+            maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+            minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+            connectTimeoutMS=int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+            serverSelectionTimeoutMS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+            socketTimeoutMS=int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000")),
+        )
+    return _client
+
+
+def get_mongo_collection(name: str):
+    return get_mongo_client()[MONGO_DATABASE][name]
+
+
+async def close_mongo_client():
+    """서버 종료 시 클라이언트 정리"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
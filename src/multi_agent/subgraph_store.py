@@ -0,0 +1,179 @@
+import os
+import json
+import zlib
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+
+SUBGRAPH_STORE_PATH = os.getenv("SUBGRAPH_STORE_PATH", os.path.join(".cache", "subgraphs.sqlite"))
+# 스냅샷 payload 형식 버전. 서브그래프 형식이 바뀌면 올려서 이전 스냅샷을 사용하지 않도록 함
+SUBGRAPH_FORMAT = "2"
+# 프론트엔드가 그리는 노드 속성만 전달 (홈페이지, 주요 제품, 대표자명 등은 제외)
+SUBGRAPH_NODE_PROPERTIES = ["stock_code", "sector"]
+_PROJECTION = ", ".join(f".{name}" for name in SUBGRAPH_NODE_PROPERTIES)
+
+# 경쟁사/업종 이웃 노드와 관계를 모으는 Cypher 조각 (c: 기준 Company 노드)
+_NEIGHBORHOOD = """
+        CALL {
+            WITH c
+            MATCH (c)-[r]->(n)
+            WHERE type(r) IN ['HAS_COMPETITOR', 'BELONGS_TO']
+            RETURN collect({
+                node_type: labels(n)[0],
+                properties: n {%s},
+                node_name: CASE
+                    WHEN labels(n)[0] = 'Company' THEN n.stock_name
+                    WHEN labels(n)[0] = 'Sector' THEN n.sector
+                END
+            }) as nodes,
+            collect({
+                start: {
+                    name: c.stock_name,
+                    type: labels(c)[0]
+                },
+                relationship: type(r),
+                end: {
+                    name: CASE
+                        WHEN type(r) = 'HAS_COMPETITOR' THEN n.stock_name
+                        WHEN type(r) = 'BELONGS_TO' THEN n.sector
+                    END,
+                    type: labels(n)[0]
+                }
+            }) as relations
+        }
+        WITH nodes, relations, c
+        RETURN c.stock_name as stock_name,
+        nodes + [{
+            node_type: labels(c)[0],
+            properties: c {%s},
+            node_name: c.stock_name
+        }] as nodes,
+        relations as relations
+""".replace("%s", _PROJECTION)
+
+COMPANY_SUBGRAPH_QUERY = "MATCH (c:Company {stock_name: $stock_name})" + _NEIGHBORHOOD
+
+ALL_COMPANY_SUBGRAPHS_QUERY = "MATCH (c:Company) WHERE c.stock_name IS NOT NULL" + _NEIGHBORHOOD
+
+# 그래프 적재 파이프라인이 (:GraphMeta {version}) 노드를 갱신하면 그 값을, 없으면 노드/관계 수(카운트 스토어 조회)를 버전으로 사용
+GRAPH_VERSION_QUERY = """
+CALL { MATCH (n) RETURN count(n) as node_count }
+CALL { MATCH ()-[r]->() RETURN count(r) as relationship_count }
+CALL { OPTIONAL MATCH (m:GraphMeta) RETURN max(m.version) as version }
+RETURN version, node_count, relationship_count
+"""
+
+
+def subgraph_version(subgraph: Dict[str, list]) -> str:
+    """서브그래프 내용 해시. 클라이언트가 이미 가진 서브그래프인지 비교하는 데 사용"""
+    payload = json.dumps(subgraph, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def to_subgraph(record) -> Dict[str, object]:
+    if not record:
+        return {}
+    subgraph = {"node": record["nodes"], "relation": record["relations"]}
+    return {"version": subgraph_version(subgraph), **subgraph}
+
+
+async def fetch_graph_version(driver) -> str:
+    """현재 Neo4j 그래프의 버전 문자열"""
+    async with driver.session() as session:
+        result = await session.run(GRAPH_VERSION_QUERY)
+        record = await result.single()
+    return f"{record['version'] or ''}:{record['node_count']}:{record['relationship_count']}"
+
+
+async def fetch_company_subgraph(driver, stock_name: str) -> Dict[str, list]:
+    async with driver.session() as session:
+        result = await session.run(COMPANY_SUBGRAPH_QUERY, stock_name=stock_name)
+        record = await result.single()
+    return to_subgraph(record)
+
+
+class SubgraphStore:
+    """종목명 → 서브그래프 스냅샷을 저장하는 로컬 키-값 저장소 (SQLite, zlib 압축 JSON)
+
+    스냅샷을 만든 시점의 그래프 버전을 함께 저장하며, 배치 작업이 파일을 통째로 교체하면 다음 조회 시 다시 엽니다.
+    """
+
+    def __init__(self, path: str = SUBGRAPH_STORE_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stat: Optional[Tuple[int, int]] = None
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        if self._conn is None or self._stat != (stat.st_ino, stat.st_mtime_ns):
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._stat = (stat.st_ino, stat.st_mtime_ns)
+            meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+            self._version = meta.get("graph_version") if meta.get("format") == SUBGRAPH_FORMAT else None
+        return self._conn
+
+    @property
+    def version(self) -> Optional[str]:
+        """저장된 스냅샷의 그래프 버전 (저장소가 없으면 None)"""
+        with self._lock:
+            return self._version if self._connection() is not None else None
+
+    def get(self, stock_name: str) -> Optional[Dict[str, list]]:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute("SELECT payload FROM subgraph WHERE stock_name = ?", (stock_name,)).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def write(self, graph_version: str, subgraphs: Iterable[Tuple[str, Dict[str, list]]]) -> int:
+        """새 파일에 스냅샷을 기록한 뒤 원자적으로 교체"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE subgraph (stock_name TEXT PRIMARY KEY, payload BLOB) WITHOUT ROWID")
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [("graph_version", graph_version), ("format", SUBGRAPH_FORMAT)])
+            count = 0
+            for stock_name, subgraph in subgraphs:
+                payload = zlib.compress(json.dumps(subgraph, ensure_ascii=False, default=str).encode("utf-8"))
+                conn.execute("INSERT OR REPLACE INTO subgraph VALUES (?, ?)", (stock_name, payload))
+                count += 1
+            conn.commit()
+        finally:
+            conn.close()
+
+        os.replace(tmp_path, self.path)
+        return count
+
+
+async def materialize_subgraphs(driver, store: Optional[SubgraphStore] = None) -> Tuple[str, int]:
+    """모든 Company 노드의 서브그래프를 조회하여 저장소를 다시 생성"""
+    store = store or SubgraphStore()
+    graph_version = await fetch_graph_version(driver)
+
+    subgraphs = []
+    async with driver.session() as session:
+        result = await session.run(ALL_COMPANY_SUBGRAPHS_QUERY)
+        async for record in result:
+            subgraphs.append((record["stock_name"], to_subgraph(record)))
+
+    # 조회 도중 그래프가 다시 적재되었다면 섞인 스냅샷이 되므로 저장하지 않음
+    if await fetch_graph_version(driver) != graph_version:
+        raise RuntimeError("그래프가 스냅샷 생성 도중 변경되었습니다. 다시 실행하세요.")
+
+    return graph_version, store.write(graph_version, subgraphs)
@@ -1,8 +1,7 @@
 import os
 import json
 import asyncio
-import difflib
-import FinanceDataReader as fdr
+import hashlib
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from dataclasses import asdict, dataclass, field
@@ -13,9 +12,13 @@ from langgraph.types import Command, interrupt
 from langgraph.graph import StateGraph
 from langgraph.config import get_stream_writer
 from langchain_openai import ChatOpenAI
-from neo4j import GraphDatabase
 from sqlalchemy.ext.asyncio import create_async_engine
 from .prompt import SYSTEM_TEMPLATE, TRADING_SYSTEM_TEMPLATE, STOCK_NAME_USER_TEMPLATE, STOCK_CODE_USER_TEMPLATE
+from ..company_search import get_company_search_index
+from ..entity_resolution import get_stock_resolver, resolution_stats
+from ..graph_db import get_neo4j_driver
+from ..subgraph_store import SubgraphStore, fetch_company_subgraph, fetch_graph_version
+from ..cache import TTLCache
 from ..utils import place_order, get_user_kis_credentials, get_access_token, update_user_kis_credentials, custom_add_messages
 
 
@@ -46,6 +49,10 @@ class TradingAction(BaseModel):
     order_quantity: int = Field(description="The quantity of the stock to be traded")
 
 
+# 여러 종목 질문일 때 종목별로 나누어 실행하는 에이전트
+PER_STOCK_AGENTS = {"MarketAnalysisAgent", "FundamentalAnalysisAgent", "TechnicalAnalysisAgent"}
+
+
 def custom_truncate_agent_results(existing: list, update: list):
     return update[-10:]
 
@@ -60,6 +67,7 @@ class State:
     trading_action: dict = field(default_factory=dict)
     stock_name: str = field(default="")
     stock_code: str = field(default="")
+    stocks: list = field(default_factory=list)
     subgraph: dict = field(default_factory=dict)
 
 @dataclass
@@ -82,6 +90,17 @@ class SupervisorAgent:
         self.llm_with_stock_name = self.llm.with_structured_output(StockName)
         self.llm_with_stock_code = self.llm.with_structured_output(StockCode)
         self.agents_by_name = {agent.name: agent for agent in agents}
+        # 종목별 경쟁사/업종 서브그래프 캐시
+        self.subgraph_cache = TTLCache(
+            maxsize=int(os.getenv("SUBGRAPH_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("SUBGRAPH_CACHE_TTL", "3600")),
+        )
+        # 배치 작업으로 미리 만들어 둔 종목별 서브그래프 스냅샷과 그래프 버전 확인 주기
+        self.subgraph_store = SubgraphStore()
+        self.graph_version_cache = TTLCache(
+            maxsize=1,
+            ttl=float(os.getenv("GRAPH_VERSION_CHECK_INTERVAL", "60")),
+        )
         # 그래프 구성
         self.workflow = StateGraph(State)
         self.workflow.add_node("supervisor", self.supervisor)
@@ -114,14 +133,21 @@ class SupervisorAgent:
     async def execute_agent(self, state: State, config: RunnableConfig):
         stream_writer = get_stream_writer()
         
-        async def stream_single_agent(router):
-            """단일 에이전트 스트리밍 처리"""
+        async def stream_single_agent(router, stock=None):
+            """단일 에이전트 스트리밍 처리. stock이 주어지면 해당 종목만 분석"""
             content = f"<user>\n{router['message']}\n</user>\n"
 
-            if state.stock_name != "None":
-                content += f"\n<stock_name>\n{state.stock_name}\n</stock_name>\n"
-            if state.stock_code != "None":
-                content += f"\n<stock_code>\n{state.stock_code}\n</stock_code>\n"
+            stock_name = stock["stock_name"] if stock else state.stock_name
+            stock_code = stock["stock_code"] if stock else state.stock_code
+            if stock:
+                content += "\n여러 종목에 대한 요청 중 아래 종목에 대해서만 분석하세요. 종목 간 비교는 Supervisor가 수행합니다.\n"
+            if stock_name != "None":
+                content += f"\n<stock_name>\n{stock_name}\n</stock_name>\n"
+            if stock_code != "None":
+                content += f"\n<stock_code>\n{stock_code}\n</stock_code>\n"
+            if not stock and len(state.stocks) > 1:
+                stocks_str = json.dumps(state.stocks, ensure_ascii=False)
+                content += f"\n<stocks>\n{stocks_str}\n</stocks>\n"
 
             if state.agent_results:
                 agent_results_str = json.dumps(
@@ -148,17 +174,29 @@ class SupervisorAgent:
                 elif response_type == "values":
                     final_response = response
             
-            return router, final_response
+            return router, stock, final_response
 
-        # 여러 에이전트를 병렬로 스트리밍 처리
-        tasks = [stream_single_agent(router) for router in state.agent_messages]
+        # 여러 에이전트를 병렬로 스트리밍 처리 (여러 종목이면 종목 단위 분석 에이전트는 종목별로도 병렬 실행)
+        tasks = []
+        for router in state.agent_messages:
+            if len(state.stocks) > 1 and router["target"] in PER_STOCK_AGENTS:
+                tasks += [stream_single_agent(router, stock) for stock in state.stocks]
+            else:
+                tasks.append(stream_single_agent(router))
         results = await asyncio.gather(*tasks)
 
-        agent_results = []
-        for router, result in results:
-            agent_results.append(
-                router | {"result": result['messages'][-1].content}
-            )
+        # 같은 요청에 대한 종목별 결과를 하나로 병합
+        merged_results = {}
+        for router, stock, result in results:
+            content = result['messages'][-1].content
+            if stock:
+                content = f"[{stock['stock_name']} ({stock['stock_code']})]\n{content}"
+            key = (router["target"], router["message"])
+            if key in merged_results:
+                merged_results[key]["result"] += "\n\n" + content
+            else:
+                merged_results[key] = router | {"result": content}
+        agent_results = list(merged_results.values())
 
         update = {
             "agent_messages": [],
@@ -199,6 +237,7 @@ class SupervisorAgent:
                 messages=[AIMessage(content=trading_result)],
                 agent_results=[],
                 stock_name=state.stock_name,
+                stocks=state.stocks,
                 subgraph=state.subgraph
             )
             goto = "__end__"
@@ -207,6 +246,7 @@ class SupervisorAgent:
                 messages=[AIMessage(content="주문을 취소합니다.")],
                 agent_results=state.agent_results,
                 stock_name=state.stock_name,
+                stocks=state.stocks,
                 subgraph=state.subgraph
             )
             goto = "__end__"
@@ -214,6 +254,28 @@ class SupervisorAgent:
         return Command(update=update, goto=goto)
     
     async def get_stock_name_code_by_query_subgraph(self, query):
+        # 사전 매칭으로 종목이 하나로 특정되면 LLM 호출 없이 바로 사용
+        # 서로 겹치지 않는 온전한 종목명이 여러 개면 (비교 질문) 모두 사용하고 서브그래프를 병렬 조회 후 병합
+        # 모호한 종목명(짧은 이름, 일상어와 같은 이름)이나 겹치는 매칭이 있으면 LLM으로 판단
+        candidates, ambiguous = get_stock_resolver().resolve(query)
+        if candidates and not ambiguous:
+            resolution_stats.record("dictionary" if len(candidates) == 1 else "dictionary_multiple")
+            stocks = [
+                {"stock_name": candidate["stock_name"], "stock_code": candidate["stock_code"]}
+                for candidate in candidates
+            ]
+            subgraphs = await asyncio.gather(
+                *[self.get_subgraph_by_stock_name(stock["stock_name"]) for stock in stocks]
+            )
+            return {
+                "stock_name": stocks[0]["stock_name"],
+                "stock_code": stocks[0]["stock_code"],
+                "stocks": stocks,
+                "subgraph": merge_subgraphs(subgraphs),
+            }
+
+        # 사전에서 종목을 찾지 못했거나 모호하면 LLM으로 판단
+        resolution_stats.record("llm_ambiguous" if ambiguous else "llm_no_candidate")
         messages = [HumanMessage(content=STOCK_NAME_USER_TEMPLATE.format(user_request=query))]
         response = await self.llm_with_stock_name.ainvoke(messages)
         stock_name = response.stock_name
@@ -222,63 +284,37 @@ class SupervisorAgent:
             messages = [HumanMessage(content=STOCK_CODE_USER_TEMPLATE.format(stock_name=stock_name, stock_codes=stock_codes))]
             response = await self.llm_with_stock_code.ainvoke(messages)
             stock_code = response.stock_code
-            subgraph = self.get_subgraph_by_stock_name(stock_name)
+            subgraph = await self.get_subgraph_by_stock_name(stock_name)
         else:
             stock_code = "None"
             subgraph = "None"
 
-        return {"stock_name": stock_name, "stock_code": stock_code, "subgraph": subgraph}
+        stocks = [{"stock_name": stock_name, "stock_code": stock_code}] if stock_name != "None" else []
+        return {"stock_name": stock_name, "stock_code": stock_code, "stocks": stocks, "subgraph": subgraph}
     
-    def get_subgraph_by_stock_name(self, stock_name):
-        driver = GraphDatabase.driver(os.getenv("NEO4J_URI"), auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD")))
-        
-        query = """
-        MATCH (c:Company {stock_name: $stock_name})
-        CALL {
-            WITH c
-            MATCH (c)-[r]->(n)
-            WHERE type(r) IN ['HAS_COMPETITOR', 'BELONGS_TO']
-            RETURN collect({
-                node_type: labels(n)[0],
-                properties: properties(n),
-                node_name: CASE 
-                    WHEN labels(n)[0] = 'Company' THEN n.stock_name
-                    WHEN labels(n)[0] = 'Sector' THEN n.sector
-                END
-            }) as nodes,
-            collect({
-                start: {
-                    name: c.stock_name,
-                    type: labels(c)[0]
-                },
-                relationship: type(r),
-                end: {
-                    name: CASE 
-                        WHEN type(r) = 'HAS_COMPETITOR' THEN n.stock_name
-                        WHEN type(r) = 'BELONGS_TO' THEN n.sector
-                    END,
-                    type: labels(n)[0]
-                }
-            }) as relations
-        }
-        WITH nodes, relations, c
-        RETURN nodes + [{
-            node_type: labels(c)[0],
-            properties: properties(c),
-            node_name: c.stock_name
-        }] as nodes,
-        relations as relations
-        """
-        
-        with driver.session() as session:
-            result = session.run(query, stock_name=stock_name)
-            record = result.single()
-            if record:
-                return {
-                    "node": record["nodes"],
-                    "relation": record["relations"]
-                }
-            return {}
+    async def get_graph_version(self):
+        """현재 그래프 버전 (GRAPH_VERSION_CHECK_INTERVAL초 동안 재사용)"""
+        graph_version = self.graph_version_cache.get("graph_version")
+        if graph_version is None:
+            graph_version = await fetch_graph_version(get_neo4j_driver())
+            self.graph_version_cache.set("graph_version", graph_version)
+        return graph_version
+
+    async def get_subgraph_by_stock_name(self, stock_name):
+        # 그래프가 다시 적재되면 버전이 바뀌므로 이전 버전으로 캐시된 서브그래프는 더 이상 조회되지 않음
+        graph_version = await self.get_graph_version()
+        cache_key = (graph_version, stock_name)
+        subgraph = self.subgraph_cache.get(cache_key)
+        if subgraph is not None:
+            return subgraph
+
+        if self.subgraph_store.version == graph_version:
+            # 스냅샷이 현재 그래프 기준이면 Neo4j 조회 없이 그대로 사용 (없는 종목은 Company 노드가 없는 경우)
+            subgraph = self.subgraph_store.get(stock_name) or {}
+        else:
+            subgraph = await fetch_company_subgraph(get_neo4j_driver(), stock_name)
+        self.subgraph_cache.set(cache_key, subgraph)
+        return subgraph
     
     async def trading(self, state, config):
         result = state.agent_results[-1]["result"]
@@ -291,7 +327,7 @@ class SupervisorAgent:
         trading_action = await self.llm_with_trading.ainvoke(trading_messages)
         messages = [AIMessage(content=result + "\n\n아래 주문 정보를 수락하겠습니까?\n" + trading_action.model_dump_json())]
 
-        update = {"messages": messages, "trading_action": trading_action.model_dump(), "subgraph": state.subgraph, "stock_name": state.stock_name}
+        update = {"messages": messages, "trading_action": trading_action.model_dump(), "subgraph": state.subgraph, "stock_name": state.stock_name, "stocks": state.stocks}
         goto = "execute_trading"
         return update, goto
     
@@ -312,7 +348,7 @@ class SupervisorAgent:
         tasks += [self.llm_with_router.ainvoke(messages)]
 
         results = await asyncio.gather(*tasks)
-        stock_info = {"subgraph": "None", "stock_name": "None", "stock_code": "None"}
+        stock_info = {"subgraph": "None", "stock_name": "None", "stock_code": "None", "stocks": []}
         if len(results) == 2:
             stock_info, router_info = results
         else:
@@ -321,6 +357,13 @@ class SupervisorAgent:
         subgraph = state.subgraph if stock_info["subgraph"] == "None" else stock_info["subgraph"]
         stock_name = state.stock_name if stock_info["stock_name"] == "None" else stock_info["stock_name"]
         stock_code = state.stock_code if stock_info["stock_code"] == "None" else stock_info["stock_code"]
+        if state.execute_agent_count == 0:
+            # 사용자 턴마다 새로 결정하여 이전 턴의 여러 종목 목록이 남지 않도록 함. 질의에서 찾지 못하면 현재 종목 하나만 유지
+            stocks = stock_info["stocks"] or (
+                [{"stock_name": stock_name, "stock_code": stock_code}] if stock_name not in ("", "None") else []
+            )
+        else:
+            stocks = state.stocks
 
         if router_info.routers[0].target == "User":
             update = State(
@@ -328,7 +371,8 @@ class SupervisorAgent:
                 agent_results=state.agent_results,
                 subgraph=subgraph,
                 stock_name=stock_name,
-                stock_code=stock_code
+                stock_code=stock_code,
+                stocks=stocks
             )
             goto = "__end__"
         else:
@@ -341,7 +385,8 @@ class SupervisorAgent:
                     agent_results=state.agent_results,
                     subgraph=subgraph,
                     stock_name=stock_name,
-                    stock_code=stock_code
+                    stock_code=stock_code,
+                    stocks=stocks
                 )
                 goto = "__end__"
             else:
@@ -352,25 +397,38 @@ class SupervisorAgent:
                     "execute_agent_count": state.execute_agent_count + 1,
                     "subgraph": subgraph,
                     "stock_name": stock_name,
-                    "stock_code": stock_code
+                    "stock_code": stock_code,
+                    "stocks": stocks
                 }
                 goto = "execute_agent"
         return update, goto
     
+def merge_subgraphs(subgraphs: list):
+    """여러 종목의 서브그래프를 노드/관계 중복 없이 하나로 병합 (하나도 없으면 다른 경로와 같이 "None")"""
+    subgraphs = [subgraph for subgraph in subgraphs if subgraph]
+    if len(subgraphs) <= 1:
+        return subgraphs[0] if subgraphs else "None"
+
+    nodes, relations = {}, {}
+    for subgraph in subgraphs:
+        for node in subgraph.get("node", []):
+            nodes.setdefault((node["node_type"], node["node_name"]), node)
+        for relation in subgraph.get("relation", []):
+            key = (relation["start"]["name"], relation["relationship"], relation["end"]["name"])
+            relations.setdefault(key, relation)
+
+    if not nodes:
+        return "None"
+    # 병합 결과의 버전은 구성 서브그래프 버전으로부터 계산 (병합 결과 전체를 다시 직렬화하지 않음)
+    version = hashlib.sha1("+".join(subgraph.get("version", "") for subgraph in subgraphs).encode("utf-8")).hexdigest()[:16]
+    return {"version": version, "node": list(nodes.values()), "relation": list(relations.values())}
+
+
 def find_similar_companies(company_name: str, top_n: int = 10):
-    stock_df = fdr.StockListing('KRX')
-    map_stock_code = dict(zip(stock_df['Name'], stock_df['Code']))
-    
-    similarities = []
-    for name in map_stock_code.keys():
-        ratio = difflib.SequenceMatcher(None, company_name, name).ratio()
-        similarities.append((name, ratio))
-    
-    similarities.sort(key=lambda x: x[1], reverse=True)
-    top_companies = similarities[:top_n]
-    
+    top_companies = get_company_search_index().search(company_name, top_n=top_n)
+
     result = {}
-    for name, _ in top_companies:
-        result[name] = map_stock_code[name]
-    
+    for name, code, _ in top_companies:
+        result[name] = code
+
     return result 
\ No newline at end of file
@@ -18,9 +18,11 @@ If none of the conditions match the current situation, respond to the user direc
     "Available Tools": [
       "News search tool", 
       "Professional investment bank report search tool", 
+      "Semantic search tool for the most relevant report and news passages", 
       "News and report sentiment analysis tool", 
       "YouTube search tool",
-      "Financial knowledge graph analysis tool"
+      "Financial knowledge graph analysis tool",
+      "Competitor comparison tool (indicators, financial statements and recent prices of a company and all its competitors)"
     ],
     "when to make the request": [
       "When the user’s request is related to available tools.", 
@@ -31,7 +33,8 @@ If none of the conditions match the current situation, respond to the user direc
     "name": "FundamentalAnalysisAgent",
     "description": "Corporate fundamental analysis expert",
     "Available Tools": [
-      "Financial statement analysis tool"
+      "Financial statement analysis tool",
+      "Financial ratio screening tool across all listed companies"
     ],
     "when to make the request": [
       "When the user’s request is related to available tools.", 
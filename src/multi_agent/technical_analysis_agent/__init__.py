@@ -1,16 +1,27 @@
 import os
 from .agent import TechnicalAnalysisAgent
 from .prompt import SYSTEM_TEMPLATE
-from .tools import *
 
 
-agent = TechnicalAnalysisAgent(
-    model="gpt-4o-mini",
-    tools=[
-        AnalysisStockTool(async_database_url=os.environ["ASYNC_DATABASE_URL"]),
-        PredictStockTool(),
-        StockChartAnalysisTool(async_database_url=os.environ["ASYNC_DATABASE_URL"]),
-    ],
-    system=SYSTEM_TEMPLATE,
-    name="TechnicalAnalysisAgent",
-)
\ No newline at end of file
+def build_agent():
+    from .tools import AnalysisStockTool, PredictStockTool, StockChartAnalysisTool
+
+    return TechnicalAnalysisAgent(
+        model="gpt-4o-mini",
+        tools=[
+            AnalysisStockTool(async_database_url=os.environ["ASYNC_DATABASE_URL"]),
+            PredictStockTool(),
+            StockChartAnalysisTool(async_database_url=os.environ["ASYNC_DATABASE_URL"]),
+        ],
+        system=SYSTEM_TEMPLATE,
+        name="TechnicalAnalysisAgent",
+    )
+
+
+def __getattr__(name):
+    # 하위 모듈(tools 등)만 import할 때는 에이전트와 도구(외부 연결 포함)를 만들지 않도록 최초 접근 시 생성
+    global agent
+    if name == "agent":
+        agent = build_agent()
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,22 +9,34 @@ from langchain_core.runnables import RunnableConfig
 from langchain_openai import ChatOpenAI
 import asyncio
 import os
+import json
 import numpy as np
 import base64
 import mojito
 import dotenv
 from multi_agent.utils import get_user_kis_credentials, get_access_token, update_user_kis_credentials
+from .patterns import detect_chart_patterns
 from sqlalchemy.ext.asyncio import create_async_engine
 
 
-CHART_USER_TEMPLATE = """이 {stock_code} ({company_name}) 주식 차트를 분석하고 다음 정보를 제공해주세요:
+TIMEFRAME_PERIODS = {
+    "W": "W-FRI",  # 주봉: 금요일 마감 기준
+    "M": "M",      # 월봉
+}
+TIMEFRAME_NAMES = {"D": "일봉", "W": "주봉", "M": "월봉"}
+
+
+CHART_USER_TEMPLATE = """이 {stock_code} ({company_name}) 주식 {timeframe_name} 차트를 분석하고 다음 정보를 제공해주세요:
 1. 주요 기술적 패턴 및 현재 추세
 2. 볼린저 밴드, 이동평균선, MACD 신호 분석
 3. RSI와 스토캐스틱 지표 해석
 4. 거래량 변화와 그 의미
 5. 주요 지지/저항 레벨
 6. 향후 가능한 가격 움직임에 대한 기술적 전망
-7. 투자자에게 유용한 실행 가능한 인사이트"""
+7. 투자자에게 유용한 실행 가능한 인사이트
+
+아래는 OHLCV 데이터에서 계산한 지지/저항 가격대, 메워지지 않은 갭, 최근 캔들 패턴입니다. 지지/저항 레벨과 패턴은 이 수치를 기준으로 설명해주세요.
+{patterns}"""
 
 
 class StockChartAnalysisInput(BaseModel):
@@ -39,6 +51,11 @@ class StockChartAnalysisInput(BaseModel):
         ge=1,
         le=3650
     )
+
+    timeframe: str = Field(
+        default="D",
+        description="차트 봉 주기 (D: 일봉, W: 주봉, M: 월봉). 1년 이상의 장기 분석에는 W 또는 M을 권장"
+    )
     
     rsi_period: int = Field(
         default=14,
@@ -86,6 +103,33 @@ class StockChartAnalysisInput(BaseModel):
             raise ValueError("한국 주식 코드는 6자리 숫자여야 합니다")
         return v
 
+    @field_validator('timeframe')
+    def validate_timeframe(cls, v):
+        v = v.upper()
+        if v not in TIMEFRAME_NAMES:
+            raise ValueError("timeframe은 D, W, M 중 하나여야 합니다")
+        return v
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """일봉 OHLCV를 주봉/월봉으로 변환 (각 봉의 날짜는 해당 기간의 마지막 거래일)"""
+    if timeframe == "D" or df.empty:
+        return df
+
+    periods = df.index.to_period(TIMEFRAME_PERIODS[timeframe])
+    resampled = df.assign(Date=df.index).groupby(periods).agg(
+        Date=('Date', 'last'),
+        Open=('Open', 'first'),
+        High=('High', 'max'),
+        Low=('Low', 'min'),
+        Close=('Close', 'last'),
+        Volume=('Volume', 'sum'),
+    )
+    resampled = resampled.set_index('Date')
+    resampled['Change'] = resampled['Close'].pct_change().fillna(0.0)
+    return resampled
+
+
 class StockChartAnalyzer:
     """한국 주식 차트 생성 및 AI 분석 클래스"""
     
@@ -183,13 +227,30 @@ class StockChartAnalyzer:
         d = k.rolling(window=d_period).mean()
         return k, d
 
-    async def create_chart(self, input_data: StockChartAnalysisInput, user_id: int) -> str:
+    def detect_patterns(self, df: pd.DataFrame, stock_code: str) -> Dict[str, Any]:
+        """지지/저항 가격대, 갭, 캔들 패턴 계산"""
+        return detect_chart_patterns(
+            df['Open'].to_numpy(),
+            df['High'].to_numpy(),
+            df['Low'].to_numpy(),
+            df['Close'].to_numpy(),
+            dates=df.index.strftime("%Y-%m-%d").to_numpy(),
+            codes=[stock_code],
+        )[0]
+
+    async def create_chart(self, input_data: StockChartAnalysisInput, user_id: int) -> tuple:
         """차트 생성 및 저장"""
         try:
             df = await self.get_stock_data(input_data.stock_code, input_data.period_days, user_id)
             info = {"longName": input_data.stock_name}
             if df is None:
-                return None, None
+                return None, None, None
+
+            # 선택한 봉 주기로 변환 (추가 API 호출 없이 일봉에서 계산)
+            df = resample_ohlcv(df, input_data.timeframe)
+
+            # 지지/저항 및 패턴 탐지
+            patterns = self.detect_patterns(df, input_data.stock_code)
             
             # 기술적 지표 계산
             # MACD
@@ -224,6 +285,12 @@ class StockChartAnalyzer:
                 ma = df['Close'].rolling(window=period).mean()
                 ax1.plot(df.index, ma, label=f'MA{period}', alpha=0.7)
 
+            # 지지/저항 가격대
+            for zone in patterns['support_zones']:
+                ax1.axhline(y=zone['price'], color='green', linestyle=':', alpha=0.5)
+            for zone in patterns['resistance_zones']:
+                ax1.axhline(y=zone['price'], color='red', linestyle=':', alpha=0.5)
+
             # 거래량 차트
             ax2.bar(df.index, df['Volume'], label='Volume', color='darkgray', alpha=0.7)
             
@@ -248,7 +315,7 @@ class StockChartAnalyzer:
             
             # 차트 스타일링
             company_name = input_data.company_name or info.get('longName', 'Unknown')
-            ax1.set_title(f'{input_data.stock_code} Technical Analysis Chart')
+            ax1.set_title(f'{input_data.stock_code} Technical Analysis Chart ({input_data.timeframe})')
             ax1.legend(loc='upper left')
             ax2.legend(loc='upper left')
             ax3.legend(loc='upper left')
@@ -267,16 +334,16 @@ class StockChartAnalyzer:
             # 차트 저장
             save_path = 'charts'
             os.makedirs(save_path, exist_ok=True)
-            chart_path = os.path.join(save_path, f"{input_data.stock_code}_analysis.png")
+            chart_path = os.path.join(save_path, f"{input_data.stock_code}_{input_data.timeframe}_analysis.png")
             plt.savefig(chart_path)
             plt.close()
 
-            return chart_path, company_name
+            return chart_path, company_name, patterns
         except Exception as e:
             print(f"차트 생성 실패: {str(e)}")
-            return None, None
+            return None, None, None
 
-    async def analyze_chart(self, chart_path: str, stock_code: str, company_name: str) -> str:
+    async def analyze_chart(self, chart_path: str, stock_code: str, company_name: str, patterns: Dict[str, Any], timeframe: str = "D") -> str:
         """차트 이미지 분석"""
         try:
             # 이미지를 base64로 인코딩
@@ -296,7 +363,12 @@ class StockChartAnalyzer:
                         },
                         {
                             "type": "text",
-                            "text": CHART_USER_TEMPLATE.format(stock_code=stock_code, company_name=company_name)
+                            "text": CHART_USER_TEMPLATE.format(
+                                stock_code=stock_code,
+                                company_name=company_name,
+                                timeframe_name=TIMEFRAME_NAMES[timeframe],
+                                patterns=json.dumps(patterns, ensure_ascii=False)
+                            )
                         }
                     ]
                 }
@@ -315,6 +387,7 @@ class StockChartAnalysisTool(BaseTool):
     name: str = "korean_stock_chart_analysis"
     description: str = """
     한국 주식의 기술적 차트를 생성하고 AI를 통해 차트 패턴, 추세, 기술적 지표를 분석합니다.
+    일봉(D), 주봉(W), 월봉(M) 중 봉 주기를 선택할 수 있으며, 기술적 지표는 선택한 봉 주기로 계산됩니다.
     볼린저 밴드, 이동평균선, MACD, RSI, 스토캐스틱 등의 기술 지표를 포함한 차트를 생성하고
     GPT-4를 통해 차트의 패턴과 가능한 가격 움직임을 자세히 분석합니다.
     """
@@ -336,6 +409,7 @@ class StockChartAnalysisTool(BaseTool):
         stock_name: str,
         stock_code: str,
         period_days: int = 180,
+        timeframe: str = "D",
         rsi_period: int = 14,
         bb_period: int = 20,
         ma_periods: List[int] = None,
@@ -353,6 +427,7 @@ class StockChartAnalysisTool(BaseTool):
             stock_name=stock_name,
             stock_code=stock_code,
             period_days=period_days,
+            timeframe=timeframe,
             rsi_period=rsi_period,
             bb_period=bb_period,
             ma_periods=ma_periods,
@@ -368,6 +443,7 @@ class StockChartAnalysisTool(BaseTool):
         stock_name: str,
         stock_code: str,
         period_days: int = 180,
+        timeframe: str = "D",
         rsi_period: int = 14,
         bb_period: int = 20,
         ma_periods: List[int] = None,
@@ -386,6 +462,7 @@ class StockChartAnalysisTool(BaseTool):
                 stock_name=stock_name,
                 stock_code=stock_code,
                 period_days=period_days,
+                timeframe=timeframe,
                 rsi_period=rsi_period,
                 bb_period=bb_period,
                 ma_periods=ma_periods,
@@ -395,17 +472,22 @@ class StockChartAnalysisTool(BaseTool):
             )
             
             # 차트 생성
-            chart_path, company_name = await self.analyzer.create_chart(input_data, user_id=config["configurable"]["user_id"])
+            chart_path, company_name, patterns = await self.analyzer.create_chart(input_data, user_id=config["configurable"]["user_id"])
             if not chart_path:
                 return {"error": "차트 생성에 실패했습니다."}
             
             # 차트 AI 분석
-            analysis = await self.analyzer.analyze_chart(chart_path, stock_code, company_name)
+            analysis = await self.analyzer.analyze_chart(chart_path, stock_code, company_name, patterns, input_data.timeframe)
             
             output = {
                 "stock_code": stock_code,
                 "company_name": company_name,
+                "timeframe": input_data.timeframe,
                 "analysis": analysis,
+                "support_zones": patterns["support_zones"],
+                "resistance_zones": patterns["resistance_zones"],
+                "open_gaps": patterns["open_gaps"],
+                "recent_candle_patterns": patterns["recent_candle_patterns"],
             }
 
             return output
@@ -0,0 +1,308 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+
+CANDLE_PATTERN_NAMES = {
+    "doji": "도지",
+    "hammer": "망치형",
+    "shooting_star": "유성형",
+    "bullish_engulfing": "상승 장악형",
+    "bearish_engulfing": "하락 장악형",
+    "morning_star": "샛별형",
+    "evening_star": "석별형",
+}
+
+
+def stack_ohlcv(frames: Dict[str, pd.DataFrame]) -> Dict[str, np.ndarray]:
+    """종목별 OHLCV DataFrame을 (종목 수, 봉 수) 2차원 배열로 변환 (짧은 종목은 앞쪽을 NaN으로 채움)"""
+    codes = list(frames.keys())
+    n_bars = max((len(df) for df in frames.values()), default=0)
+
+    arrays = {}
+    for column in ["Open", "High", "Low", "Close", "Volume"]:
+        array = np.full((len(codes), n_bars), np.nan)
+        for i, code in enumerate(codes):
+            values = frames[code][column].to_numpy(dtype=float)
+            if len(values):
+                array[i, n_bars - len(values):] = values
+        arrays[column] = array
+
+    arrays["codes"] = np.array(codes)
+    return arrays
+
+
+def _window_reduce(a: np.ndarray, size: int, op) -> np.ndarray:
+    """행별 길이 size 구간의 최대/최소 (구간 길이를 두 배씩 늘려 log(size)번의 원소별 연산으로 계산)"""
+    result, span = a, 1
+    while span * 2 <= size:
+        result = op(result[:, :-span], result[:, span:])
+        span *= 2
+    if span < size:
+        result = op(result[:, :span - size], result[:, size - span:])
+    return result
+
+
+def find_pivots(high: np.ndarray, low: np.ndarray, window: int = 5):
+    """좌우 window개 봉 안에서 최고/최저인 봉을 피봇 고점/저점으로 표시"""
+    high = np.atleast_2d(high)
+    low = np.atleast_2d(low)
+    size = 2 * window + 1
+
+    pivot_high = np.zeros(high.shape, dtype=bool)
+    pivot_low = np.zeros(low.shape, dtype=bool)
+    if high.shape[1] < size:
+        return pivot_high, pivot_low
+
+    high_filled = np.where(np.isnan(high), -np.inf, high)
+    low_filled = np.where(np.isnan(low), np.inf, low)
+    window_max = _window_reduce(high_filled, size, np.maximum)
+    window_min = _window_reduce(low_filled, size, np.minimum)
+
+    center = slice(window, high.shape[1] - window)
+    pivot_high[:, center] = (high[:, center] == window_max) & ~np.isnan(high[:, center])
+    pivot_low[:, center] = (low[:, center] == window_min) & ~np.isnan(low[:, center])
+    return pivot_high, pivot_low
+
+
+def cluster_levels(prices: np.ndarray, tolerance: float = 0.015, min_touches: int = 2) -> Dict[str, np.ndarray]:
+    """종목별 피봇 가격을 상대 간격(tolerance) 기준으로 묶어 가격대(zone)로 변환
+
+    prices는 (종목 수, 봉 수) 배열이며 피봇이 아닌 위치는 NaN이어야 합니다.
+    (종목 수, 가격대 수) 배열의 price/low/high/touches를 반환하며, 터치 수가 min_touches 미만인 가격대의 price는 NaN입니다.
+    """
+    prices = np.atleast_2d(prices)
+    n_rows = prices.shape[0]
+    sorted_prices = np.sort(prices, axis=1)  # NaN은 뒤쪽으로 정렬됨
+    valid = ~np.isnan(sorted_prices)
+    # 피봇은 드물므로 모든 종목이 NaN인 뒤쪽 열은 잘라냄
+    n_valid = int(valid.sum(axis=1).max(initial=0))
+    sorted_prices, valid = sorted_prices[:, :max(n_valid, 1)], valid[:, :max(n_valid, 1)]
+
+    # 직전 가격 대비 상대 간격이 tolerance를 넘으면 새로운 가격대 시작
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rel_gap = np.diff(sorted_prices, axis=1) / sorted_prices[:, :-1]
+    new_zone = np.concatenate([np.ones((n_rows, 1), dtype=bool), ~(rel_gap <= tolerance)], axis=1)
+    zone_ids = np.cumsum(new_zone, axis=1) - 1
+
+    n_zones = max(int(zone_ids.max(initial=0)) + 1, 1)
+    flat_ids = (np.arange(n_rows)[:, None] * n_zones + zone_ids)[valid]
+    values = sorted_prices[valid]
+
+    size = n_rows * n_zones
+    counts = np.bincount(flat_ids, minlength=size)
+    sums = np.bincount(flat_ids, weights=values, minlength=size)
+    # 가격대 안의 가격은 정렬되어 있으므로 첫 가격이 하단, 마지막 가격이 상단
+    starts = np.flatnonzero(np.diff(flat_ids, prepend=-1))
+    ends = np.append(starts[1:] - 1, len(flat_ids) - 1)
+    lows = np.full(size, np.inf)
+    highs = np.full(size, -np.inf)
+    lows[flat_ids[starts]] = values[starts]
+    highs[flat_ids[ends]] = values[ends]
+
+    counts = counts.reshape(n_rows, n_zones)
+    means = np.divide(sums.reshape(n_rows, n_zones), counts, out=np.full((n_rows, n_zones), np.nan), where=counts >= min_touches)
+    return {
+        "price": np.round(means, 2),
+        "low": lows.reshape(n_rows, n_zones),
+        "high": highs.reshape(n_rows, n_zones),
+        "touches": counts,
+    }
+
+
+def _split_by_row(rows: np.ndarray, items: list, n_rows: int) -> List[list]:
+    """행 번호 순으로 정렬된 항목 목록을 종목별 목록으로 분리"""
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_rows))])
+    return [items[bounds[i]:bounds[i + 1]] for i in range(n_rows)]
+
+
+def _nearest_zones(zones: Dict[str, np.ndarray], mask: np.ndarray, key: np.ndarray, top_n: int) -> List[List[Dict]]:
+    """mask에 해당하는 가격대 중 key가 작은 순으로 종목별 top_n개"""
+    n_rows = mask.shape[0]
+    order = np.argsort(np.where(mask, key, np.inf), axis=1, kind="stable")[:, :top_n]
+    rows, k = np.nonzero(np.take_along_axis(mask, order, axis=1))
+    z = order[rows, k]
+    # tolist()로 한 번에 파이썬 값으로 변환 (원소별 float() 변환보다 빠름)
+    items = [
+        {"price": price, "low": low, "high": high, "touches": touches}
+        for price, low, high, touches in zip(
+            zones["price"][rows, z].tolist(),
+            zones["low"][rows, z].tolist(),
+            zones["high"][rows, z].tolist(),
+            zones["touches"][rows, z].tolist(),
+        )
+    ]
+    return _split_by_row(rows, items, n_rows)
+
+
+def detect_gaps(high: np.ndarray, low: np.ndarray):
+    """갭 상승/하락 위치와 이후 갭이 메워졌는지 여부 계산"""
+    high = np.atleast_2d(high)
+    low = np.atleast_2d(low)
+
+    prev_high = np.roll(high, 1, axis=1)
+    prev_low = np.roll(low, 1, axis=1)
+    prev_high[:, 0] = np.nan
+    prev_low[:, 0] = np.nan
+
+    gap_up = low > prev_high
+    gap_down = high < prev_low
+
+    # 이후 구간의 최저/최고가 (다음 봉부터)로 갭 메움 여부 판단
+    low_filled = np.where(np.isnan(low), np.inf, low)
+    high_filled = np.where(np.isnan(high), -np.inf, high)
+    future_min = np.minimum.accumulate(low_filled[:, ::-1], axis=1)[:, ::-1]
+    future_max = np.maximum.accumulate(high_filled[:, ::-1], axis=1)[:, ::-1]
+    future_min = np.concatenate([future_min[:, 1:], np.full((low.shape[0], 1), np.inf)], axis=1)
+    future_max = np.concatenate([future_max[:, 1:], np.full((high.shape[0], 1), -np.inf)], axis=1)
+
+    gap_up_filled = gap_up & (future_min <= prev_high)
+    gap_down_filled = gap_down & (future_max >= prev_low)
+    return gap_up, gap_down, gap_up_filled, gap_down_filled
+
+
+def detect_candlestick_patterns(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    doji_ratio: float = 0.1,
+) -> Dict[str, np.ndarray]:
+    """주요 캔들 패턴을 봉 단위 불리언 배열로 반환"""
+    open_, high, low, close = (np.atleast_2d(a) for a in (open_, high, low, close))
+
+    body = np.abs(close - open_)
+    candle_range = high - low
+    upper_shadow = high - np.maximum(open_, close)
+    lower_shadow = np.minimum(open_, close) - low
+    bullish = close > open_
+    bearish = close < open_
+
+    def shift(a, n):
+        shifted = np.roll(a, n, axis=1)
+        shifted[:, :n] = np.nan if shifted.dtype.kind == "f" else False
+        return shifted
+
+    prev_open, prev_close, prev_body = shift(open_, 1), shift(close, 1), shift(body, 1)
+    prev_bullish, prev_bearish = shift(bullish, 1), shift(bearish, 1)
+    prev2_open, prev2_close, prev2_body = shift(open_, 2), shift(close, 2), shift(body, 2)
+    prev2_bullish, prev2_bearish = shift(bullish, 2), shift(bearish, 2)
+
+    with np.errstate(invalid="ignore"):
+        doji = (candle_range > 0) & (body <= doji_ratio * candle_range)
+        small_upper = upper_shadow <= np.maximum(body, 0.1 * candle_range)
+        small_lower = lower_shadow <= np.maximum(body, 0.1 * candle_range)
+        hammer = (body > 0) & (lower_shadow >= 2 * body) & small_upper
+        shooting_star = (body > 0) & (upper_shadow >= 2 * body) & small_lower
+
+        bullish_engulfing = prev_bearish & bullish & (open_ <= prev_close) & (close >= prev_open) & (body > prev_body)
+        bearish_engulfing = prev_bullish & bearish & (open_ >= prev_close) & (close <= prev_open) & (body > prev_body)
+
+        # 3봉 패턴: 큰 캔들 → 작은 몸통 → 반대 방향 큰 캔들 (첫 봉 몸통 중간 이상 회복)
+        small_middle = prev_body <= 0.5 * prev2_body
+        morning_star = prev2_bearish & small_middle & bullish & (close >= (prev2_open + prev2_close) / 2)
+        evening_star = prev2_bullish & small_middle & bearish & (close <= (prev2_open + prev2_close) / 2)
+
+    return {
+        "doji": doji,
+        "hammer": hammer,
+        "shooting_star": shooting_star,
+        "bullish_engulfing": bullish_engulfing,
+        "bearish_engulfing": bearish_engulfing,
+        "morning_star": morning_star,
+        "evening_star": evening_star,
+    }
+
+
+def detect_chart_patterns(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    dates: Optional[np.ndarray] = None,
+    codes: Optional[List[str]] = None,
+    pivot_window: int = 5,
+    zone_tolerance: float = 0.015,
+    min_touches: int = 2,
+    recent_bars: int = 5,
+) -> List[Dict]:
+    """여러 종목의 지지/저항 가격대, 미충족 갭, 최근 캔들 패턴을 한 번에 계산
+
+    입력 배열은 (종목 수, 봉 수) 또는 1차원(단일 종목)이며, 종목별로 하나의 결과 딕셔너리를 반환합니다.
+    """
+    open_, high, low, close = (np.atleast_2d(np.asarray(a, dtype=float)) for a in (open_, high, low, close))
+    n_rows, n_bars = close.shape
+    if codes is None:
+        codes = [str(i) for i in range(n_rows)]
+    if dates is None:
+        dates = np.arange(n_bars)
+    dates = np.asarray(dates)
+    if dates.ndim == 1:
+        dates = np.broadcast_to(dates, close.shape)
+
+    pivot_high, pivot_low = find_pivots(high, low, pivot_window)
+    # 고점/저점 피봇을 함께 묶어 같은 가격대가 지지/저항으로 두 번 나오지 않도록 함 (횡보 구간 등)
+    pivot_prices = np.concatenate([np.where(pivot_high, high, np.nan), np.where(pivot_low, low, np.nan)], axis=1)
+    zones = cluster_levels(pivot_prices, zone_tolerance, min_touches)
+    gap_up, gap_down, gap_up_filled, gap_down_filled = detect_gaps(high, low)
+
+    # 종목별 마지막 유효 종가
+    has_close = ~np.isnan(close)
+    last_index = n_bars - 1 - np.argmax(has_close[:, ::-1], axis=1)
+    last_close = close[np.arange(n_rows), last_index]
+
+    # 캔들 패턴은 최근 봉만 필요하므로 3봉 패턴에 필요한 앞쪽 2봉까지만 잘라서 계산
+    first = max(int(last_index.min()) - recent_bars - 1, 0) if n_rows else 0
+    window = slice(first, n_bars)
+    candles = detect_candlestick_patterns(open_[:, window], high[:, window], low[:, window], close[:, window])
+
+    # 현재가 아래는 가까운 순(높은 가격 순)으로 지지, 위는 가까운 순(낮은 가격 순)으로 저항
+    has_zone = ~np.isnan(zones["price"])
+    with np.errstate(invalid="ignore"):
+        below = has_zone & (zones["price"] < last_close[:, None])
+    support = _nearest_zones(zones, below, -zones["price"], 3)
+    resistance = _nearest_zones(zones, has_zone & ~below, zones["price"], 3)
+
+    # 미충족 갭: 종목별 마지막 5개
+    open_gap = (gap_up & ~gap_up_filled) | (gap_down & ~gap_down_filled)
+    rows, cols = np.nonzero(open_gap)
+    gap_counts = np.bincount(rows, minlength=n_rows)
+    position = np.arange(len(rows)) - np.concatenate([[0], np.cumsum(gap_counts)[:-1]])[rows]
+    keep = position >= gap_counts[rows] - 5
+    rows, cols = rows[keep], cols[keep]
+    is_up = gap_up[rows, cols]
+    prev_high = np.concatenate([np.full((n_rows, 1), np.nan), high[:, :-1]], axis=1)
+    prev_low = np.concatenate([np.full((n_rows, 1), np.nan), low[:, :-1]], axis=1)
+    gap_from = np.where(is_up, prev_high[rows, cols], prev_low[rows, cols])
+    gap_to = np.where(is_up, low[rows, cols], high[rows, cols])
+    open_gaps = _split_by_row(rows, [
+        {"date": str(date)[:10], "type": "gap_up" if up else "gap_down", "from": start, "to": end}
+        for date, up, start, end in zip(dates[rows, cols].tolist(), is_up.tolist(), gap_from.tolist(), gap_to.tolist())
+    ], n_rows)
+
+    # 최근 recent_bars개 봉의 캔들 패턴 (종목, 봉, 패턴 순)
+    bar = np.arange(first, n_bars)
+    recent = (bar >= (last_index - recent_bars + 1)[:, None]) & (bar <= last_index[:, None])
+    names = list(candles)
+    hits = np.stack([candles[name] for name in names]) & recent
+    patterns, rows, cols = np.nonzero(hits)
+    cols = cols + first
+    order = np.lexsort((patterns, cols, rows))
+    patterns, rows, cols = patterns[order], rows[order], cols[order]
+    recent_patterns = _split_by_row(rows, [
+        {"date": str(date)[:10], "pattern": CANDLE_PATTERN_NAMES[names[pattern]]}
+        for date, pattern in zip(dates[rows, cols].tolist(), patterns.tolist())
+    ], n_rows)
+
+    last_close = [None if np.isnan(price) else price for price in last_close.tolist()]
+    return [
+        {
+            "stock_code": codes[row],
+            "last_close": last_close[row],
+            "support_zones": support[row],
+            "resistance_zones": resistance[row],
+            "open_gaps": open_gaps[row],
+            "recent_candle_patterns": recent_patterns[row],
+        }
+        for row in range(n_rows)
+    ]
@@ -0,0 +1,74 @@
+import os
+import re
+from datetime import datetime, time
+from typing import Optional
+from zoneinfo import ZoneInfo
+from langchain_openai import ChatOpenAI
+from .cache import TTLCache, SingleFlight
+
+
+KST = ZoneInfo("Asia/Seoul")
+# 장중에는 뉴스가 빠르게 바뀌므로 짧게, 장 마감 후/주말에는 길게 캐시
+WEB_SEARCH_TTL_MARKET = float(os.getenv("WEB_SEARCH_TTL_MARKET", "300"))
+WEB_SEARCH_TTL_CLOSED = float(os.getenv("WEB_SEARCH_TTL_CLOSED", "3600"))
+MARKET_OPEN = time(9, 0)
+MARKET_CLOSE = time(15, 30)
+
+_SPACES = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\s\?\.\!,]+|[\s\?\.\!,]+$")
+
+
+def normalize_query(query: str) -> str:
+    """대소문자, 공백, 앞뒤 문장부호 차이를 무시한 캐시 키"""
+    return _EDGE_PUNCTUATION.sub("", _SPACES.sub(" ", query.lower()))
+
+
+def search_cache_ttl(now: Optional[datetime] = None) -> float:
+    """KRX 정규장(평일 09:00~15:30 KST) 중이면 짧은 TTL, 아니면 긴 TTL"""
+    now = (now or datetime.now(KST)).astimezone(KST)
+    if now.weekday() < 5 and MARKET_OPEN <= now.time() <= MARKET_CLOSE:
+        return WEB_SEARCH_TTL_MARKET
+    # 장 시작 직전에 캐시된 결과가 장중까지 남지 않도록 다음 개장 시각을 넘기지 않음
+    if now.weekday() < 5 and now.time() < MARKET_OPEN:
+        until_open = (datetime.combine(now.date(), MARKET_OPEN, KST) - now).total_seconds()
+        return max(min(WEB_SEARCH_TTL_CLOSED, until_open), WEB_SEARCH_TTL_MARKET)
+    return WEB_SEARCH_TTL_CLOSED
+
+
+class WebSearch:
+    """perplexity/sonar 웹 검색. 정규화된 질의 기준 캐시와 동일 질의 동시 요청 합치기(single-flight) 적용"""
+
+    def __init__(self, llm: ChatOpenAI, maxsize: int = 1024):
+        self.llm = llm
+        self.cache = TTLCache(maxsize=maxsize, ttl=WEB_SEARCH_TTL_CLOSED)
+        self.in_flight = SingleFlight()
+
+    async def search(self, query: str) -> str:
+        key = normalize_query(query)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        return await self.in_flight.run(key, lambda: self._search(key, query))
+
+    async def _search(self, key: str, query: str) -> str:
+        response = await self.llm.ainvoke(query)
+        self.cache.set(key, response.content, ttl=search_cache_ttl())
+        return response.content
+
+
+_web_search: Optional[WebSearch] = None
+
+
+def get_web_search() -> WebSearch:
+    """뉴스 검색/투자 전략 검색 도구가 함께 쓰는 공용 웹 검색 (같은 질의면 결과도 공유)"""
+    global _web_search
+    if _web_search is None:
+        _web_search = WebSearch(
+            ChatOpenAI(
+                base_url="https://openrouter.ai/api/v1",
+                model="perplexity/sonar",
+                api_key=os.getenv("OPENROUTER_API_KEY")
+            ),
+            maxsize=int(os.getenv("WEB_SEARCH_CACHE_SIZE", "1024")),
+        )
+    return _web_search
@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from multi_agent.entity_resolution import resolution_stats
 
 router = APIRouter(tags=["base"])
 
@@ -10,4 +11,9 @@ def read_root():
 @router.get("/health")
 async def health_check():
     """헬스 체크 엔드포인트"""
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+@router.get("/stats/entity_resolution")
+async def entity_resolution_stats():
+    """종목 식별 경로별(사전 매칭/LLM) 호출 통계"""
+    return resolution_stats.snapshot()
@@ -18,6 +18,10 @@ class ChatRequest(BaseModel):
         description="사용자 피드백",
         default=None
     )
+    subgraph_version: Optional[str] = Field(
+        description="클라이언트가 이미 가지고 있는 서브그래프 버전. 응답의 서브그래프 버전과 같으면 서브그래프를 다시 보내지 않음",
+        default=None
+    )
 
 class StreamingStatus(BaseModel):
     type: str = Field(description="메시지 타입: 'progress'", default="progress")
@@ -30,10 +34,14 @@ class FinalResponse(BaseModel):
         description="채팅 메시지",
         default="삼성전자에 대한 투자전략은 다음과 같습니다. ..."
     )
-    subgraph: dict = Field(
-        description="종목에 대한 서브그래프. 만약 서브그래프가 없는경우 빈 딕셔너리를 반환",
+    subgraph: Optional[dict] = Field(
+        description="종목에 대한 서브그래프. 만약 서브그래프가 없는경우 빈 딕셔너리를 반환. 요청의 subgraph_version과 같아 생략된 경우 None",
         default={}
     )
+    subgraph_version: Optional[str] = Field(
+        description="서브그래프 버전 (내용 해시). 서브그래프가 없는 경우 None",
+        default=None
+    )
     trading_action: Optional[dict] = Field(
         description="투자전략 추천시 구체적인 트레이딩 액션. 트레이딩 액션이 없는 경우 None. order_side는 buy, sell 중 하나. order_type는 market, limit 중 하나. order_price는 주문 가격으로 order_type이 limit인 경우에만 주문 가격이 존재하고 market인 경우 null. order_quantity는 주문 수량.",
         default={
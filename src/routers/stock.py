@@ -19,7 +19,23 @@ CHECKPOINT_DATABASE_URI = os.getenv("CHECKPOINT_DATABASE_URI")
 
 router = APIRouter(prefix="/stock", tags=["stock"])
 
-async def generate_sse_response(multi_agent, input_state, user_id, thread_id):
+def build_final_response(state, client_subgraph_version=None):
+    """최종 상태로 응답 생성. 클라이언트가 같은 버전의 서브그래프를 이미 가지고 있으면 서브그래프를 생략"""
+    subgraph = dict(state.get("subgraph") or {})
+    version = subgraph.pop("version", None)
+    if version is not None and version == client_subgraph_version:
+        subgraph = None
+
+    return FinalResponse(
+        type="final",
+        message=state.get("messages", [{}])[-1].content,
+        subgraph=subgraph,
+        subgraph_version=version,
+        trading_action=state.get("trading_action")
+    )
+
+
+async def generate_sse_response(multi_agent, input_state, user_id, thread_id, subgraph_version=None):
     """풀의 생명주기를 스트리밍과 맞춰 관리하는 SSE 응답 생성기"""
     try:
         # 스트리밍 함수 내부에서 풀 생성 및 관리
@@ -47,7 +63,7 @@ async def generate_sse_response(multi_agent, input_state, user_id, thread_id):
                 },
             }
             
-            final_response = FinalResponse()
+            final_state = None
             async for response_type, response in multi_agent.astream(
                 input_state, 
                 config=config,
@@ -62,12 +78,10 @@ async def generate_sse_response(multi_agent, input_state, user_id, thread_id):
                     yield f"data: {json.dumps(streaming_response.model_dump(), ensure_ascii=False)}\n\n"
                     
                 elif response_type == "values":
-                    final_response = FinalResponse(
-                        type="final",
-                        message=response.get("messages", [{}])[-1].content,
-                        subgraph=response.get("subgraph", {}),
-                        trading_action=response.get("trading_action")
-                    )
+                    final_state = response
+
+            # 최종 응답은 마지막 상태로 한 번만 생성
+            final_response = FinalResponse() if final_state is None else build_final_response(final_state, subgraph_version)
             yield f"data: {json.dumps(final_response.model_dump(), ensure_ascii=False)}\n\n"
             yield "data: [DONE]\n\n"
         
@@ -98,7 +112,7 @@ async def stock_chat(request: ChatRequest) -> StreamingResponse:
             input_state = Command(resume=human_feedback)
 
         return StreamingResponse(
-            generate_sse_response(multi_agent, input_state, user_id, thread_id),
+            generate_sse_response(multi_agent, input_state, user_id, thread_id, request.subgraph_version),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",